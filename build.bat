@@ -11,6 +11,11 @@ pip show pyinstaller >nul 2>&1 || (
     pip install pyinstaller
 )
 
+pip show charset-normalizer >nul 2>&1 || (
+    echo 正在安装 charset-normalizer...
+    pip install charset-normalizer
+)
+
 pip show chardet >nul 2>&1 || (
     echo 正在安装 chardet...
     pip install chardet
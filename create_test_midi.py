@@ -6,102 +6,118 @@ Create test MIDI files with different encodings for testing.
 
 import struct
 
+_U32_BE = struct.Struct('>I')
+_U16_BE = struct.Struct('>H')
+
+# Format 0, 1 track, 480 ticks per quarter note
+_MTHD_HEADER = (b'MThd' + _U32_BE.pack(6) + _U16_BE.pack(0)
+                + _U16_BE.pack(1) + _U16_BE.pack(480))
+
 
 def write_variable_length(value: int) -> bytes:
     """Write a variable-length quantity."""
-    result = [value & 0x7F]
-    value >>= 7
-    while value:
-        result.append((value & 0x7F) | 0x80)
+    if value < 0x80:
+        return bytes((value,))
+    n = (value.bit_length() + 6) // 7
+    buf = bytearray(n)
+    buf[n - 1] = value & 0x7F
+    for i in range(n - 2, -1, -1):
         value >>= 7
-    return bytes(reversed(result))
+        buf[i] = (value & 0x7F) | 0x80
+    return bytes(buf)
+
 
+# Delta times used by every generated track
+_VLQ_0 = write_variable_length(0)
+_VLQ_480 = write_variable_length(480)
 
-def create_midi_with_text(filename: str, texts: list, encoding: str = 'utf-8'):
+
+def encode_texts(texts: list, encoding: str) -> list:
     """
-    Create a simple MIDI file with text events.
+    Encode (meta_type, text) tuples once, ahead of MIDI creation.
 
     Args:
-        filename: Output filename
         texts: List of (meta_type, text) tuples
         encoding: Text encoding to use
+
+    Returns:
+        List of (meta_type, text_bytes) tuples
+    """
+    return [(meta_type, text.encode(encoding)) for meta_type, text in texts]
+
+
+def create_midi_with_text(filename: str, texts: list):
+    """
+    Create a simple MIDI file with text events.
+
+    Args:
+        filename: Output filename
+        texts: List of (meta_type, text_bytes) tuples, already encoded
+               (see encode_texts)
     """
     # MIDI header
-    header = b'MThd'
-    header += struct.pack('>I', 6)  # Header length
-    header += struct.pack('>H', 0)  # Format 0
-    header += struct.pack('>H', 1)  # 1 track
-    header += struct.pack('>H', 480)  # Ticks per quarter note
+    header = _MTHD_HEADER
 
     # Build track data
-    track_data = bytearray()
+    pieces = []
 
-    # Add text events
-    for meta_type, text in texts:
-        track_data.extend(write_variable_length(0))  # Delta time = 0
-        track_data.append(0xFF)  # Meta event
-        track_data.append(meta_type)  # Meta type
-        text_bytes = text.encode(encoding)
-        track_data.extend(write_variable_length(len(text_bytes)))
-        track_data.extend(text_bytes)
+    # Add text events (delta time 0, meta event, meta type, length, text)
+    for meta_type, text_bytes in texts:
+        pieces.append(_VLQ_0 + bytes((0xFF, meta_type))
+                      + write_variable_length(len(text_bytes)) + text_bytes)
 
     # Add a simple note (C4 for 1 beat)
-    track_data.extend(write_variable_length(0))  # Delta = 0
-    track_data.extend(bytes([0x90, 60, 100]))  # Note on C4 velocity 100
-
-    track_data.extend(write_variable_length(480))  # Delta = 480 ticks
-    track_data.extend(bytes([0x80, 60, 0]))  # Note off C4
+    pieces.append(_VLQ_0 + bytes([0x90, 60, 100]))  # Note on C4 velocity 100
+    pieces.append(_VLQ_480 + bytes([0x80, 60, 0]))  # Note off C4 after 480 ticks
 
     # End of track
-    track_data.extend(write_variable_length(0))
-    track_data.extend(bytes([0xFF, 0x2F, 0x00]))
+    pieces.append(_VLQ_0 + bytes([0xFF, 0x2F, 0x00]))
+
+    track_data = b''.join(pieces)
 
     # Track header
-    track = b'MTrk'
-    track += struct.pack('>I', len(track_data))
-    track += bytes(track_data)
+    track = b'MTrk' + _U32_BE.pack(len(track_data)) + track_data
 
     # Write file
     with open(filename, 'wb') as f:
-        f.write(header)
-        f.write(track)
+        f.write(header + track)
 
     print(f"Created: {filename}")
 
 
 def main():
     # Test 1: Japanese text (Shift_JIS)
-    japanese_texts = [
+    japanese_texts = encode_texts([
         (0x03, "日本語のテスト"),      # Track name
         (0x05, "さくらさくら"),         # Lyric
         (0x01, "これはテストです"),     # Text event
-    ]
-    create_midi_with_text("test_japanese.mid", japanese_texts, "shift_jis")
+    ], "shift_jis")
+    create_midi_with_text("test_japanese.mid", japanese_texts)
 
     # Test 2: Chinese text (GBK)
-    chinese_texts = [
+    chinese_texts = encode_texts([
         (0x03, "中文测试"),             # Track name
         (0x05, "茉莉花"),               # Lyric
         (0x01, "这是一个测试文件"),     # Text event
-    ]
-    create_midi_with_text("test_chinese.mid", chinese_texts, "gbk")
+    ], "gbk")
+    create_midi_with_text("test_chinese.mid", chinese_texts)
 
     # Test 3: Korean text (EUC-KR)
-    korean_texts = [
+    korean_texts = encode_texts([
         (0x03, "한국어 테스트"),        # Track name
         (0x05, "아리랑"),               # Lyric
         (0x01, "테스트 파일입니다"),    # Text event
-    ]
-    create_midi_with_text("test_korean.mid", korean_texts, "euc-kr")
+    ], "euc-kr")
+    create_midi_with_text("test_korean.mid", korean_texts)
 
     # Test 4: Mixed ASCII/UTF-8
-    utf8_texts = [
+    utf8_texts = encode_texts([
         (0x03, "UTF-8 Test Track"),
         (0x02, "Copyright © 2024"),     # Copyright
         (0x05, "Hello World! 你好世界!"),
         (0x06, "Verse 1"),              # Marker
-    ]
-    create_midi_with_text("test_utf8.mid", utf8_texts, "utf-8")
+    ], "utf-8")
+    create_midi_with_text("test_utf8.mid", utf8_texts)
 
     print("\nAll test MIDI files created successfully!")
     print("\nTest files:")
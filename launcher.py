@@ -17,34 +17,20 @@ def main():
         print(f"执行文件: {sys.executable}")
         print()
 
-        # 检查 PyQt6
-        print("检查 PyQt6...")
-        from PyQt6.QtWidgets import QApplication, QMainWindow, QMessageBox
-        from PyQt6.QtCore import Qt
-        print("PyQt6 加载成功!")
+        # 打包环境下先加入 _MEIPASS 路径，再导入任何模块
+        if hasattr(sys, '_MEIPASS') and sys._MEIPASS not in sys.path:
+            sys.path.insert(0, sys._MEIPASS)
+            print(f"添加 _MEIPASS 路径: {sys._MEIPASS}")
 
-        # 检查核心模块
-        print("检查核心模块...")
-
-        # 尝试从当前目录或打包目录导入
-        try:
-            from midi_encoding_converter import MidiEncodingConverter, detect_encoding
-            print("midi_encoding_converter 模块加载成功!")
-        except ImportError as e:
-            print(f"导入失败: {e}")
-            # 尝试添加路径
-            if hasattr(sys, '_MEIPASS'):
-                sys.path.insert(0, sys._MEIPASS)
-                print(f"添加 _MEIPASS 路径: {sys._MEIPASS}")
-            from midi_encoding_converter import MidiEncodingConverter, detect_encoding
-            print("midi_encoding_converter 模块加载成功 (第二次尝试)!")
+        # 图形界面模块会一并加载 PyQt6 和核心转换模块
+        print("正在加载界面模块...")
+        from midi_converter_gui import MainWindow, STYLESHEET
+        from PyQt6.QtWidgets import QApplication
+        print("模块加载成功!")
 
         print()
         print("正在启动图形界面...")
 
-        # 导入并启动GUI
-        from midi_converter_gui import MainWindow, STYLESHEET
-
         app = QApplication(sys.argv)
         app.setStyle('Fusion')
         app.setStyleSheet(STYLESHEET)
@@ -281,12 +281,48 @@ QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {{
 }}
 """
 
+# 控件级样式在导入时格式化一次，运行时直接复用
+_DROP_TEXT_QSS = f"color: {COLORS['text_secondary']}; font-size: 16px;"
+_DROP_HINT_QSS = f"color: {COLORS['text_muted']}; font-size: 13px;"
+_FIELD_LABEL_QSS = f"color: {COLORS['text_secondary']};"
+_ARROW_QSS = f"font-size: 20px; color: {COLORS['primary']};"
+_FOOTER_QSS = f"color: {COLORS['text_muted']}; font-size: 12px; padding-top: 8px;"
+_FILE_LABEL_IDLE_QSS = f"color: {COLORS['text_muted']}; padding: 8px 0;"
+_FILE_LABEL_SELECTED_QSS = f"color: {COLORS['success']}; padding: 8px 0;"
+_DROPZONE_ACTIVE_QSS = (
+    f"QFrame#dropZone {{ border-color: {COLORS['primary']}; "
+    f"background-color: rgba(99, 102, 241, 0.15); }}"
+)
+_DROPZONE_IDLE_QSS = ""
+
+_MIDI_EXTS = ('.mid', '.midi')
+
+# 检测置信度达到该值时，日志只显示首选编码
+_CONFIDENT_DETECTION = 0.95
+
+# 编码候选列表在导入时创建一次
+_FROM_ENCODINGS = (
+    "shift_jis", "cp932", "gbk", "gb2312", "gb18030",
+    "big5", "euc-kr", "cp949", "utf-8", "utf-16",
+    "iso-8859-1", "cp1252", "ascii",
+)
+_TO_ENCODINGS = (
+    "utf-8", "utf-16", "shift_jis", "cp932", "gbk",
+    "gb2312", "gb18030", "big5", "euc-kr", "cp949",
+    "iso-8859-1", "cp1252", "ascii",
+)
+
+
+def normalize_encoding_name(name: str) -> str:
+    """统一编码名写法 (大小写、'-' 与 '_')，用于匹配下拉框选项"""
+    return name.lower().replace('-', '_')
+
 
 class ConversionWorker(QThread):
     """MIDI 转换工作线程"""
 
     progress = pyqtSignal(int)
-    finished = pyqtSignal(dict)
+    converted = pyqtSignal(dict)
     error = pyqtSignal(str)
     log = pyqtSignal(str)
 
@@ -298,11 +334,22 @@ class ConversionWorker(QThread):
         self.from_encoding = from_encoding
         self.to_encoding = to_encoding
 
+    def configure(self, input_file: str, output_file: str,
+                  from_encoding: str, to_encoding: str):
+        """设置下一次转换的参数，线程对象可重复 start()"""
+        self.input_file = input_file
+        self.output_file = output_file
+        self.from_encoding = from_encoding
+        self.to_encoding = to_encoding
+
     def run(self):
         try:
-            self.log.emit(f"开始转换...")
-            self.log.emit(f"输入文件: {self.input_file}")
-            self.log.emit(f"编码转换: {self.from_encoding} -> {self.to_encoding}")
+            # 日志按进度节点成批发送，减少跨线程信号和界面重绘
+            self.log.emit("\n".join((
+                "开始转换...",
+                f"输入文件: {self.input_file}",
+                f"编码转换: {self.from_encoding} -> {self.to_encoding}",
+            )))
             self.progress.emit(20)
 
             converter = MidiEncodingConverter(self.from_encoding, self.to_encoding)
@@ -312,17 +359,20 @@ class ConversionWorker(QThread):
             result = converter.convert(self.input_file, self.output_file)
             self.progress.emit(80)
 
-            self.log.emit(f"\n[完成] 转换成功!")
-            self.log.emit(f"  输出文件: {result['output_file']}")
-            self.log.emit(f"  音轨数量: {result['tracks']}")
-            self.log.emit(f"  文本事件: {result['converted']} 个")
-            self.log.emit(f"  文件大小: {result['input_size']} -> {result['output_size']} 字节")
+            lines = [
+                "\n[完成] 转换成功!",
+                f"  输出文件: {result['output_file']}",
+                f"  音轨数量: {result['tracks']}",
+                f"  文本事件: {result['converted']} 个",
+                f"  文件大小: {result['input_size']} -> {result['output_size']} 字节",
+            ]
 
             if result['errors'] > 0:
-                self.log.emit(f"  [警告] 错误数: {result['errors']}")
+                lines.append(f"  [警告] 错误数: {result['errors']}")
 
+            self.log.emit("\n".join(lines))
             self.progress.emit(100)
-            self.finished.emit(result)
+            self.converted.emit(result)
 
         except Exception as e:
             self.error.emit(str(e))
@@ -331,7 +381,7 @@ class ConversionWorker(QThread):
 class DetectionWorker(QThread):
     """编码检测工作线程"""
 
-    finished = pyqtSignal(list)
+    detected = pyqtSignal(list)
     error = pyqtSignal(str)
     log = pyqtSignal(str)
 
@@ -339,19 +389,27 @@ class DetectionWorker(QThread):
         super().__init__()
         self.input_file = input_file
 
+    def configure(self, input_file: str):
+        """设置下一次检测的文件，线程对象可重复 start()"""
+        self.input_file = input_file
+
     def run(self):
         try:
             self.log.emit(f"正在检测编码: {self.input_file}")
             results = detect_encoding(self.input_file)
 
-            if results:
-                self.log.emit("\n检测到的编码:")
-                for encoding, confidence in results:
-                    self.log.emit(f"  - {encoding}: {confidence:.1%}")
+            if results and results[0][1] >= _CONFIDENT_DETECTION:
+                # 首选结果足够可信时只输出一行摘要
+                encoding, confidence = results[0]
+                self.log.emit(f"\n检测到的编码: {encoding} ({confidence:.1%})")
+            elif results:
+                lines = ["\n检测到的编码:"]
+                lines.extend(f"  - {encoding}: {confidence:.1%}" for encoding, confidence in results)
+                self.log.emit("\n".join(lines))
             else:
                 self.log.emit("未检测到编码 (文件可能仅包含ASCII文本)")
 
-            self.finished.emit(results)
+            self.detected.emit(results)
 
         except Exception as e:
             self.error.emit(str(e))
@@ -366,6 +424,7 @@ class DropZone(QFrame):
         super().__init__(parent)
         self.setObjectName("dropZone")
         self.setAcceptDrops(True)
+        self._highlighted = False
 
         layout = QVBoxLayout(self)
         layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -378,36 +437,38 @@ class DropZone(QFrame):
 
         # 文本标签
         text_label = QLabel("拖放 MIDI 文件到此处")
-        text_label.setStyleSheet(f"color: {COLORS['text_secondary']}; font-size: 16px;")
+        text_label.setStyleSheet(_DROP_TEXT_QSS)
         text_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(text_label)
 
         # 提示标签
         hint_label = QLabel('或点击"浏览"按钮选择文件')
-        hint_label.setStyleSheet(f"color: {COLORS['text_muted']}; font-size: 13px;")
+        hint_label.setStyleSheet(_DROP_HINT_QSS)
         hint_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(hint_label)
 
+    def set_highlighted(self, highlighted: bool):
+        # 状态未变化时不重新设置样式，避免 Qt 重复解析 QSS
+        if highlighted != self._highlighted:
+            self._highlighted = highlighted
+            self.setStyleSheet(_DROPZONE_ACTIVE_QSS if highlighted else _DROPZONE_IDLE_QSS)
+
     def dragEnterEvent(self, event: QDragEnterEvent):
-        if event.mimeData().hasUrls():
-            url = event.mimeData().urls()[0]
-            if url.toLocalFile().lower().endswith(('.mid', '.midi')):
+        mime_data = event.mimeData()
+        if mime_data.hasUrls():
+            file_path = mime_data.urls()[0].toLocalFile().lower()
+            if file_path.endswith(_MIDI_EXTS):
                 event.acceptProposedAction()
-                self.setStyleSheet(f"""
-                    QFrame#dropZone {{
-                        border-color: {COLORS['primary']};
-                        background-color: rgba(99, 102, 241, 0.15);
-                    }}
-                """)
+                self.set_highlighted(True)
 
     def dragLeaveEvent(self, event):
-        self.setStyleSheet("")
+        self.set_highlighted(False)
 
     def dropEvent(self, event: QDropEvent):
-        self.setStyleSheet("")
+        self.set_highlighted(False)
         url = event.mimeData().urls()[0]
         file_path = url.toLocalFile()
-        if file_path.lower().endswith(('.mid', '.midi')):
+        if file_path.lower().endswith(_MIDI_EXTS):
             self.fileDropped.emit(file_path)
 
 
@@ -416,12 +477,25 @@ class MainWindow(QMainWindow):
 
     def __init__(self):
         super().__init__()
-        self.input_file: Optional[str] = None
+        self.input_file: Optional[Path] = None
         self.output_file: Optional[str] = None
-        self.worker: Optional[QThread] = None
+        # 上次显示的进度，用于合并重复的进度信号
+        self._last_pct = -1
 
         self.init_ui()
 
+        # 工作线程只创建一次，信号也只连接一次，之后每次任务重新配置并启动
+        self.conversion_worker = ConversionWorker("", "", "", "")
+        self.conversion_worker.progress.connect(self.update_progress)
+        self.conversion_worker.log.connect(self.log_message)
+        self.conversion_worker.converted.connect(self.on_conversion_finished)
+        self.conversion_worker.error.connect(self.on_error)
+
+        self.detection_worker = DetectionWorker("")
+        self.detection_worker.log.connect(self.log_message)
+        self.detection_worker.detected.connect(self.on_detection_finished)
+        self.detection_worker.error.connect(self.on_error)
+
     def init_ui(self):
         self.setWindowTitle("MIDI 编码转换器")
         self.setMinimumSize(800, 700)
@@ -488,7 +562,7 @@ class MainWindow(QMainWindow):
 
         # 已选择文件显示
         self.file_label = QLabel("未选择文件")
-        self.file_label.setStyleSheet(f"color: {COLORS['text_muted']}; padding: 8px 0;")
+        self.file_label.setStyleSheet(_FILE_LABEL_IDLE_QSS)
         self.file_label.setWordWrap(True)
         file_section_layout.addWidget(self.file_label)
 
@@ -511,34 +585,31 @@ class MainWindow(QMainWindow):
 
         # 源编码
         from_label = QLabel("源编码:")
-        from_label.setStyleSheet(f"color: {COLORS['text_secondary']};")
+        from_label.setStyleSheet(_FIELD_LABEL_QSS)
         encoding_grid.addWidget(from_label, 0, 0)
 
         self.from_encoding = QComboBox()
-        self.from_encoding.addItems([
-            "shift_jis", "cp932", "gbk", "gb2312", "gb18030",
-            "big5", "euc-kr", "cp949", "utf-8", "utf-16",
-            "iso-8859-1", "cp1252", "ascii"
-        ])
+        self.from_encoding.addItems(_FROM_ENCODINGS)
+        # 规范化编码名 -> 下拉框索引，检测完成后 O(1) 查找
+        self._encoding_index = {
+            normalize_encoding_name(self.from_encoding.itemText(i)): i
+            for i in range(self.from_encoding.count())
+        }
         encoding_grid.addWidget(self.from_encoding, 0, 1)
 
         # 箭头
         arrow_label = QLabel("→")
-        arrow_label.setStyleSheet(f"font-size: 20px; color: {COLORS['primary']};")
+        arrow_label.setStyleSheet(_ARROW_QSS)
         arrow_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         encoding_grid.addWidget(arrow_label, 0, 2)
 
         # 目标编码
         to_label = QLabel("目标编码:")
-        to_label.setStyleSheet(f"color: {COLORS['text_secondary']};")
+        to_label.setStyleSheet(_FIELD_LABEL_QSS)
         encoding_grid.addWidget(to_label, 0, 3)
 
         self.to_encoding = QComboBox()
-        self.to_encoding.addItems([
-            "utf-8", "utf-16", "shift_jis", "cp932", "gbk",
-            "gb2312", "gb18030", "big5", "euc-kr", "cp949",
-            "iso-8859-1", "cp1252", "ascii"
-        ])
+        self.to_encoding.addItems(_TO_ENCODINGS)
         encoding_grid.addWidget(self.to_encoding, 0, 4)
 
         encoding_section_layout.addLayout(encoding_grid)
@@ -550,6 +621,11 @@ class MainWindow(QMainWindow):
         self.detect_btn.setEnabled(False)
         encoding_section_layout.addWidget(self.detect_btn)
 
+        # 自动命名：直接保存为 "原文件名_converted"，不再弹出保存对话框
+        self.auto_name_check = QCheckBox("自动命名输出文件")
+        self.auto_name_check.setChecked(False)
+        encoding_section_layout.addWidget(self.auto_name_check)
+
         left_layout.addWidget(encoding_section)
 
         # 操作按钮
@@ -607,7 +683,7 @@ class MainWindow(QMainWindow):
 
         # 页脚
         footer = QLabel("MIDI 编码转换器 v1.0.0  |  MIT 许可证")
-        footer.setStyleSheet(f"color: {COLORS['text_muted']}; font-size: 12px; padding-top: 8px;")
+        footer.setStyleSheet(_FOOTER_QSS)
         footer.setAlignment(Qt.AlignmentFlag.AlignCenter)
         main_layout.addWidget(footer)
 
@@ -622,10 +698,10 @@ class MainWindow(QMainWindow):
             self.on_file_selected(file_path)
 
     def on_file_selected(self, file_path: str):
-        self.input_file = file_path
-        file_name = Path(file_path).name
+        self.input_file = Path(file_path)
+        file_name = self.input_file.name
         self.file_label.setText(f"[已选择] {file_name}")
-        self.file_label.setStyleSheet(f"color: {COLORS['success']}; padding: 8px 0;")
+        self.file_label.setStyleSheet(_FILE_LABEL_SELECTED_QSS)
         self.convert_btn.setEnabled(True)
         self.detect_btn.setEnabled(True)
         self.log_message(f"已选择文件: {file_path}")
@@ -634,43 +710,46 @@ class MainWindow(QMainWindow):
         if not self.input_file:
             return
 
+        if self.detection_worker.isRunning():
+            return
+
         self.detect_btn.setEnabled(False)
-        self.worker = DetectionWorker(self.input_file)
-        self.worker.log.connect(self.log_message)
-        self.worker.finished.connect(self.on_detection_finished)
-        self.worker.error.connect(self.on_error)
-        self.worker.start()
+        self.detection_worker.configure(str(self.input_file))
+        self.detection_worker.start()
 
     def on_detection_finished(self, results: list):
         self.detect_btn.setEnabled(True)
         if results:
             # 设置检测到的编码
-            best_encoding = results[0][0].lower().replace('-', '_')
-            index = self.from_encoding.findText(best_encoding, Qt.MatchFlag.MatchFixedString)
-            if index >= 0:
+            best_encoding = normalize_encoding_name(results[0][0])
+            index = self._encoding_index.get(best_encoding)
+            if index is not None:
                 self.from_encoding.setCurrentIndex(index)
                 self.log_message(f"\n-> 已设置源编码为: {best_encoding}")
 
     def start_conversion(self):
-        if not self.input_file:
+        if not self.input_file or self.conversion_worker.isRunning():
             return
 
         # 生成输出文件路径
-        input_path = Path(self.input_file)
-        self.output_file = str(input_path.parent / f"{input_path.stem}_converted{input_path.suffix}")
+        default_output = self.input_file.with_name(
+            f"{self.input_file.stem}_converted{self.input_file.suffix}")
+        self.output_file = str(default_output)
 
-        # 询问用户保存位置
-        output_path, _ = QFileDialog.getSaveFileName(
-            self,
-            "保存转换后的 MIDI 文件",
-            self.output_file,
-            "MIDI 文件 (*.mid *.midi);;所有文件 (*.*)"
-        )
+        # 勾选自动命名且不会覆盖已有文件时跳过对话框，否则询问用户保存位置
+        auto_named = self.auto_name_check.isChecked() and not default_output.exists()
+        if not auto_named:
+            output_path, _ = QFileDialog.getSaveFileName(
+                self,
+                "保存转换后的 MIDI 文件",
+                self.output_file,
+                "MIDI 文件 (*.mid *.midi);;所有文件 (*.*)"
+            )
 
-        if not output_path:
-            return
+            if not output_path:
+                return
 
-        self.output_file = output_path
+            self.output_file = output_path
 
         # 禁用界面
         self.convert_btn.setEnabled(False)
@@ -678,21 +757,22 @@ class MainWindow(QMainWindow):
         self.detect_btn.setEnabled(False)
         self.progress_bar.setVisible(True)
         self.progress_bar.setValue(0)
+        self._last_pct = 0
 
         # 开始转换
-        self.worker = ConversionWorker(
-            self.input_file,
+        self.conversion_worker.configure(
+            str(self.input_file),
             self.output_file,
             self.from_encoding.currentText(),
             self.to_encoding.currentText()
         )
-        self.worker.progress.connect(self.update_progress)
-        self.worker.log.connect(self.log_message)
-        self.worker.finished.connect(self.on_conversion_finished)
-        self.worker.error.connect(self.on_error)
-        self.worker.start()
+        self.conversion_worker.start()
 
     def update_progress(self, value: int):
+        # 进度未变化时不重绘进度条
+        if value == self._last_pct:
+            return
+        self._last_pct = value
         self.progress_bar.setValue(value)
 
     def on_conversion_finished(self, result: dict):
@@ -725,10 +805,13 @@ class MainWindow(QMainWindow):
         )
 
     def log_message(self, message: str):
+        # 追加和滚动期间暂停重绘，只在最后刷新一次
+        self.log_output.setUpdatesEnabled(False)
         self.log_output.append(message)
         # 滚动到底部
         scrollbar = self.log_output.verticalScrollBar()
         scrollbar.setValue(scrollbar.maximum())
+        self.log_output.setUpdatesEnabled(True)
 
     def clear_log(self):
         self.log_output.clear()
@@ -7,9 +7,14 @@ MIDI 编码转换器 - 完整单文件版本
 
 import sys
 import os
+import codecs
+import io
+import mmap
+import shutil
 import struct
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Tuple, List, Optional
+from typing import Iterable, Iterator, Tuple, List, Optional
 
 # ============== 多语言支持 ==============
 
@@ -56,6 +61,7 @@ TRANSLATIONS = {
         'language': '🌐 语言',
         'auto': '自动检测',
         'selected_file': '已选择文件',
+        'auto_name_output': '自动命名输出文件',
     },
     'en': {
         'app_title': 'MIDI Encoding Converter',
@@ -99,20 +105,235 @@ TRANSLATIONS = {
         'language': '🌐 Language',
         'auto': 'Auto Detect',
         'selected_file': 'Selected file',
+        'auto_name_output': 'Auto-name output file',
     }
 }
 
 current_language = 'zh'
+# 当前语言的翻译表，tr() 直接查这一张表
+_CURRENT_TABLE = TRANSLATIONS['zh']
+
+
+def set_language(language):
+    """切换当前语言"""
+    global current_language, _CURRENT_TABLE
+    current_language = language
+    _CURRENT_TABLE = TRANSLATIONS.get(language, TRANSLATIONS['zh'])
+
 
 def tr(key):
     """获取翻译文本"""
-    return TRANSLATIONS.get(current_language, TRANSLATIONS['zh']).get(key, key)
+    return _CURRENT_TABLE.get(key, key)
 
 
 # ============== 核心转换模块 ==============
 
 __version__ = "1.1.0"
 
+_TEXT_CACHE_SIZE = 4096
+_WRITE_BUFFER_SIZE = 1 << 20
+_U32_BE = struct.Struct('>I')
+_ASCII_BYTES = bytes(range(128))
+_ASCII_TEXT = _ASCII_BYTES.decode('ascii')
+_SHIFT_PROBE = b'\x1b$B$"\x1b(B\x1b$)C\x0e!!\x0f~{!!~}+AGE-'
+_SHIFT_PROBE_TEXT = _SHIFT_PROBE.decode('ascii')
+_EVENT_DATA_LEN = bytes(2 if (i & 0xF0) in (0x80, 0x90, 0xA0, 0xB0, 0xE0)
+                         else 1 if (i & 0xF0) in (0xC0, 0xD0) else 0
+                         for i in range(256))
+_VLQ_SMALL = tuple([bytes((i,)) for i in range(0x80)] +
+                   [bytes((0x80 | (i >> 7), i & 0x7F)) for i in range(0x80, 0x4000)])
+
+
+@contextmanager
+def _map_input(path):
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield memoryview(b'')
+            return
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if hasattr(mmap, 'MADV_SEQUENTIAL'):
+        mm.madvise(mmap.MADV_SEQUENTIAL)
+    view = memoryview(mm)
+    try:
+        yield view
+    finally:
+        view.release()
+        mm.close()
+
+
+def _read_vlq(data, pos: int) -> Tuple[int, int]:
+    value = data[pos]
+    if value < 0x80:
+        return value, pos + 1
+    byte = data[pos + 1]
+    value = ((value & 0x7F) << 7) | (byte & 0x7F)
+    if byte < 0x80:
+        return value, pos + 2
+    byte = data[pos + 2]
+    value = (value << 7) | (byte & 0x7F)
+    if byte < 0x80:
+        return value, pos + 3
+    byte = data[pos + 3]
+    value = (value << 7) | (byte & 0x7F)
+    if byte < 0x80:
+        return value, pos + 4
+    raise ValueError("Variable-length quantity longer than 4 bytes")
+
+
+def _lookup_codec(encoding: str) -> Tuple[codecs.CodecInfo, bool]:
+    try:
+        info = codecs.lookup(encoding)
+    except LookupError as e:
+        error = e
+
+        def unknown(*args):
+            raise error
+        return codecs.CodecInfo(unknown, unknown, name=None), False
+    try:
+        ascii_compatible = (_ASCII_BYTES.decode(encoding) == _ASCII_TEXT
+                            and _ASCII_TEXT.encode(encoding) == _ASCII_BYTES)
+    except UnicodeError:
+        ascii_compatible = False
+    except LookupError:
+        info = codecs.CodecInfo(info.encode, info.decode, name=None)
+        ascii_compatible = False
+    if ascii_compatible:
+        try:
+            ascii_compatible = _SHIFT_PROBE.decode(encoding) == _SHIFT_PROBE_TEXT
+        except UnicodeError:
+            ascii_compatible = False
+    return info, ascii_compatible
+
+
+def _text_sample(payloads: Iterable[bytes], max_text_bytes: int) -> bytes:
+    sample = bytearray()
+    for payload in payloads:
+        sample += payload
+        if len(sample) >= max_text_bytes:
+            break
+    return bytes(sample)
+
+
+def _detect_cchardet(payloads: Iterable[bytes], max_text_bytes: int) -> List[Tuple[str, float]]:
+    sample = _text_sample(payloads, max_text_bytes)
+    if not sample:
+        return []
+    result = cchardet.detect(sample)
+    if result['encoding']:
+        return [(result['encoding'], result['confidence'] or 0.0)]
+    return []
+
+
+def _detect_charset_normalizer(payloads: Iterable[bytes],
+                               max_text_bytes: int) -> List[Tuple[str, float]]:
+    sample = _text_sample(payloads, max_text_bytes)
+    if not sample:
+        return []
+    return [(match.encoding, 1.0 - match.chaos) for match in from_bytes(sample)]
+
+
+def _detect_chardet(payloads: Iterable[bytes], max_text_bytes: int) -> List[Tuple[str, float]]:
+    detector = chardet.UniversalDetector()
+    fed = 0
+    for payload in payloads:
+        detector.feed(payload)
+        fed += len(payload)
+        if detector.done or fed >= max_text_bytes:
+            break
+    if not fed:
+        return []
+    detector.close()
+    result = detector.result
+    if result['encoding']:
+        return [(result['encoding'], result['confidence'])]
+    return []
+
+
+try:
+    import cchardet
+    _DETECTOR = _detect_cchardet
+except ImportError:
+    try:
+        from charset_normalizer import from_bytes
+        _DETECTOR = _detect_charset_normalizer
+    except ImportError:
+        try:
+            import chardet
+            _DETECTOR = _detect_chardet
+        except ImportError:
+            _DETECTOR = None
+
+
+def _detect_text(payloads: Iterable[bytes], max_text_bytes: int) -> List[Tuple[str, float]]:
+    if _DETECTOR is None:
+        return []
+    return _DETECTOR(payloads, max_text_bytes)
+
+
+def _scan_track(data, pos: int, end: int, spans: Optional[list] = None) -> Tuple[list, int]:
+    if spans is None:
+        spans = []
+    running_status = 0
+    event_len = _EVENT_DATA_LEN
+    is_text = _IS_TEXT_META
+    read_vlq = _read_vlq
+    add_span = spans.append
+
+    while pos < end:
+        while data[pos] & 0x80:
+            pos += 1
+        pos += 1
+
+        status = data[pos]
+
+        if status < 0x80:
+            pos += event_len[running_status] or 1
+
+        elif status < 0xF0:
+            running_status = status
+            pos += 1 + event_len[status]
+
+        elif status == 0xFF:
+            meta_type = data[pos + 1]
+            pos += 2
+            length_pos = pos
+            length = data[pos]
+            if length < 0x80:
+                pos += 1
+            else:
+                length, pos = read_vlq(data, pos)
+            if is_text[meta_type]:
+                add_span((meta_type, length_pos, pos, pos + length))
+            pos += length
+
+        elif status == 0xF0 or status == 0xF7:
+            pos += 1
+            length = data[pos]
+            if length < 0x80:
+                pos += 1
+            else:
+                length, pos = read_vlq(data, pos)
+            pos += length
+            running_status = 0
+
+        else:
+            running_status = status
+            pos += 1
+
+    return spans, pos
+
+
+def _write_tracks(write, data, header_end: int, tracks: list) -> None:
+    write(data[:header_end])
+    for read_pos, track_stop, track_size, replacements in tracks:
+        write(b'MTrk' + _U32_BE.pack(track_size))
+        for length_pos, text_end, length_vlq, new_data in replacements:
+            write(data[read_pos:length_pos])
+            write(length_vlq)
+            write(new_data)
+            read_pos = text_end
+        write(data[read_pos:track_stop])
+
 
 class MidiEncodingConverter:
     """转换 MIDI 文件中的文本编码"""
@@ -127,240 +348,257 @@ class MidiEncodingConverter:
         0x07: "Cue Point",
     }
 
+    __slots__ = (
+        'converted_count', 'error_count', 'verbose',
+        '_from_encoding', '_to_encoding', '_decode', '_encode',
+        '_from_name', '_to_name', '_from_ascii', '_to_ascii',
+        '_same_encoding', '_ascii_passthrough', '_cache',
+    )
+
     def __init__(self, from_encoding: str = "shift_jis", to_encoding: str = "utf-8"):
+        self._cache = {}
+        self._from_name = self._to_name = None
+        self._from_ascii = self._to_ascii = False
         self.from_encoding = from_encoding
         self.to_encoding = to_encoding
         self.converted_count = 0
         self.error_count = 0
         self.verbose = False
 
+    @property
+    def from_encoding(self) -> str:
+        return self._from_encoding
+
+    @from_encoding.setter
+    def from_encoding(self, value: str):
+        self._from_encoding = value
+        info, self._from_ascii = _lookup_codec(value)
+        self._decode = info.decode
+        self._from_name = info.name
+        self._update_passthrough()
+        self._cache.clear()
+
+    @property
+    def to_encoding(self) -> str:
+        return self._to_encoding
+
+    @to_encoding.setter
+    def to_encoding(self, value: str):
+        self._to_encoding = value
+        info, self._to_ascii = _lookup_codec(value)
+        self._encode = info.encode
+        self._to_name = info.name
+        self._update_passthrough()
+        self._cache.clear()
+
     @staticmethod
     def read_variable_length(data: bytes, pos: int) -> Tuple[int, int]:
-        value = 0
-        while True:
-            byte = data[pos]
-            value = (value << 7) | (byte & 0x7F)
-            pos += 1
-            if not (byte & 0x80):
-                break
-        return value, pos
+        return _read_vlq(data, pos)
 
     @staticmethod
     def write_variable_length(value: int) -> bytes:
-        result = [value & 0x7F]
-        value >>= 7
-        while value:
-            result.append((value & 0x7F) | 0x80)
-            value >>= 7
-        return bytes(reversed(result))
+        if 0 <= value < 0x4000:
+            return _VLQ_SMALL[value]
+        if value < 0x200000:
+            return bytes((0x80 | (value >> 14), 0x80 | ((value >> 7) & 0x7F), value & 0x7F))
+        if value < 0x10000000:
+            return bytes((0x80 | (value >> 21), 0x80 | ((value >> 14) & 0x7F),
+                          0x80 | ((value >> 7) & 0x7F), value & 0x7F))
+        shift = (value.bit_length() - 1) // 7 * 7
+        buf = bytearray()
+        while shift:
+            buf.append(0x80 | ((value >> shift) & 0x7F))
+            shift -= 7
+        buf.append(value & 0x7F)
+        return bytes(buf)
+
+    def _update_passthrough(self):
+        self._same_encoding = self._from_name is not None and self._from_name == self._to_name
+        self._ascii_passthrough = self._from_ascii and self._to_ascii
 
     def convert_text(self, data: bytes) -> bytes:
+        if type(data) is not bytes:
+            data = bytes(data)
+        if self._same_encoding or (self._ascii_passthrough and data.isascii()):
+            return data
+        try:
+            return self._cache[data]
+        except KeyError:
+            pass
         try:
-            text = data.decode(self.from_encoding, errors='replace')
-            return text.encode(self.to_encoding)
+            text = self._decode(data, 'replace')[0]
+            result = self._encode(text)[0]
         except Exception as e:
             self.error_count += 1
             if self.verbose:
                 print(f"Warning: Conversion error - {e}", file=sys.stderr)
             return data
+        cache = self._cache
+        if len(cache) >= _TEXT_CACHE_SIZE:
+            del cache[next(iter(cache))]
+        cache[data] = result
+        return result
 
-    def convert(self, input_file: str, output_file: Optional[str] = None) -> dict:
-        input_path = Path(input_file)
-
-        if output_file is None:
-            output_file = input_path.stem + "_converted" + input_path.suffix
-
-        with open(input_file, 'rb') as f:
-            data = bytearray(f.read())
+    def _stats(self, track_count: int, input_size: int, output_size: int) -> dict:
+        return {
+            'from_encoding': self.from_encoding,
+            'tracks': track_count,
+            'converted': self.converted_count,
+            'errors': self.error_count,
+            'input_size': input_size,
+            'output_size': output_size,
+        }
 
+    def _plan(self, data, auto_detect: bool, max_text_bytes: int) -> Tuple[int, list, int, bool]:
         if data[:4] != b'MThd':
             raise ValueError("Not a valid MIDI file (missing MThd header)")
 
         self.converted_count = 0
         self.error_count = 0
+        self._cache.clear()
 
-        pos = 0
-        output = bytearray()
-
-        header_length = struct.unpack('>I', data[4:8])[0]
-        output.extend(data[:8 + header_length])
-        pos = 8 + header_length
+        raw = data.obj
+        data_len = len(data)
+        header_end = 8 + _U32_BE.unpack_from(data, 4)[0]
 
-        track_count = 0
-        while pos < len(data):
+        scanned = []
+        pos = header_end
+        intact = True
+        while pos < data_len:
             if data[pos:pos+4] != b'MTrk':
+                intact = False
                 break
 
-            track_count += 1
-            track_start = len(output)
-            output.extend(data[pos:pos+4])
-            pos += 4
-
-            track_length = struct.unpack('>I', data[pos:pos+4])[0]
-            pos += 4
-            output.extend(b'\x00\x00\x00\x00')
-
-            track_data_start = len(output)
-            track_end = pos + track_length
-
-            running_status = 0
-
-            while pos < track_end:
-                delta, new_pos = self.read_variable_length(data, pos)
-                output.extend(self.write_variable_length(delta))
-                pos = new_pos
-
-                status = data[pos]
-
-                if status == 0xFF:
-                    output.append(data[pos])
-                    pos += 1
-                    meta_type = data[pos]
-                    output.append(data[pos])
-                    pos += 1
-                    length, new_pos = self.read_variable_length(data, pos)
-                    pos = new_pos
-
-                    meta_data = data[pos:pos + length]
-                    pos += length
-
-                    if meta_type in self.TEXT_META_TYPES:
-                        new_data = self.convert_text(bytes(meta_data))
-                        self.converted_count += 1
-                    else:
-                        new_data = meta_data
-
-                    output.extend(self.write_variable_length(len(new_data)))
-                    output.extend(new_data)
-
-                elif status == 0xF0 or status == 0xF7:
-                    output.append(data[pos])
-                    pos += 1
-                    length, new_pos = self.read_variable_length(data, pos)
-                    output.extend(self.write_variable_length(length))
-                    pos = new_pos
-                    output.extend(data[pos:pos + length])
-                    pos += length
-                    running_status = 0
-
-                elif status & 0x80:
-                    running_status = status
-                    output.append(data[pos])
-                    pos += 1
-
-                    if status & 0xF0 in (0x80, 0x90, 0xA0, 0xB0, 0xE0):
-                        output.extend(data[pos:pos+2])
-                        pos += 2
-                    elif status & 0xF0 in (0xC0, 0xD0):
-                        output.append(data[pos])
-                        pos += 1
-
-                else:
-                    if running_status:
-                        output.append(data[pos])
-                        pos += 1
-                        if running_status & 0xF0 in (0x80, 0x90, 0xA0, 0xB0, 0xE0):
-                            output.append(data[pos])
-                            pos += 1
-                    else:
-                        output.append(data[pos])
-                        pos += 1
-
-            track_data_length = len(output) - track_data_start
-            struct.pack_into('>I', output, track_start + 4, track_data_length)
-
-        with open(output_file, 'wb') as f:
-            f.write(output)
+            track_length = _U32_BE.unpack_from(data, pos + 4)[0]
+            pos += 8
+            spans, track_stop = _scan_track(data, pos, pos + track_length)
+            if track_stop != pos + track_length:
+                intact = False
+            track_stop = min(track_stop, data_len)
+            scanned.append((pos, track_stop, spans))
+            pos = track_stop
+
+        if auto_detect:
+            results = _detect_text(
+                (raw[text_start:text_end]
+                 for _, _, spans in scanned
+                 for _, _, text_start, text_end in spans),
+                max_text_bytes)
+            if results:
+                self.from_encoding = results[0][0]
+
+        if self._same_encoding and intact:
+            self.converted_count = sum(len(spans) for _, _, spans in scanned)
+            tracks = [(pos, track_stop, track_stop - pos, ()) for pos, track_stop, _ in scanned]
+            return header_end, tracks, data_len, True
+
+        tracks = []
+        output_size = header_end
+        ascii_passthrough = self._ascii_passthrough
+        convert_text = self.convert_text
+        write_vlq = self.write_variable_length
+        for pos, track_stop, spans in scanned:
+            replacements = []
+            add_replacement = replacements.append
+            track_size = track_stop - pos
+            self.converted_count += len(spans)
+            for meta_type, length_pos, text_start, text_end in spans:
+                meta_data = raw[text_start:text_end]
+                if ascii_passthrough and text_end <= data_len and meta_data.isascii():
+                    continue
+                new_data = convert_text(meta_data)
+                if new_data == meta_data and text_end <= data_len:
+                    continue
+                n = len(new_data)
+                if n == text_end - text_start and text_end <= data_len:
+                    add_replacement((text_start, text_end, b'', new_data))
+                    continue
+                length_vlq = write_vlq(n)
+                text_end = min(text_end, data_len)
+                add_replacement((length_pos, text_end, length_vlq, new_data))
+                track_size += len(length_vlq) + n - (text_end - length_pos)
+
+            tracks.append((pos, track_stop, track_size, replacements))
+            output_size += 8 + track_size
+
+        return header_end, tracks, output_size, False
+
+    def convert(self, input_file: str, output_file: Optional[str] = None,
+                auto_detect: bool = False, max_text_bytes: int = 65536) -> dict:
+        input_path = Path(input_file)
 
-        return {
-            'input_file': str(input_file),
-            'output_file': str(output_file),
-            'tracks': track_count,
-            'converted': self.converted_count,
-            'errors': self.error_count,
-            'input_size': len(data),
-            'output_size': len(output),
-        }
+        if output_file is None:
+            output_file = str(input_path.with_name(
+                input_path.stem + "_converted" + input_path.suffix))
+
+        result = {'input_file': str(input_file), 'output_file': str(output_file)}
+
+        if os.path.exists(output_file) and os.path.samefile(input_file, output_file):
+            with open(input_file, 'rb') as f:
+                output, stats = self.convert_bytes(f.read(), auto_detect, max_text_bytes)
+            with open(output_file, 'wb') as f:
+                f.write(output)
+            result.update(stats)
+            return result
+
+        with _map_input(input_file) as data:
+            header_end, tracks, output_size, unchanged = self._plan(data, auto_detect, max_text_bytes)
+            if unchanged:
+                shutil.copyfile(input_file, output_file)
+            else:
+                with open(output_file, 'wb', buffering=_WRITE_BUFFER_SIZE) as f:
+                    _write_tracks(f.write, data, header_end, tracks)
+            input_size = len(data)
+
+        result.update(self._stats(len(tracks), input_size, output_size))
+        return result
+
+    def convert_bytes(self, midi_data: bytes, auto_detect: bool = False,
+                      max_text_bytes: int = 65536) -> Tuple[bytes, dict]:
+        midi_data = bytes(midi_data)
+        with memoryview(midi_data) as data:
+            header_end, tracks, output_size, unchanged = self._plan(data, auto_detect, max_text_bytes)
+            if unchanged:
+                output = midi_data
+            else:
+                buf = io.BytesIO()
+                _write_tracks(buf.write, data, header_end, tracks)
+                output = buf.getvalue()
 
+        return output, self._stats(len(tracks), len(midi_data), output_size)
 
-def detect_encoding(input_file: str) -> List[Tuple[str, float]]:
-    """检测MIDI文件中文本的编码"""
-    try:
-        import chardet
-    except ImportError:
-        return []
 
-    with open(input_file, 'rb') as f:
-        data = f.read()
+_IS_TEXT_META = bytes(int(t in MidiEncodingConverter.TEXT_META_TYPES) for t in range(256))
 
-    if data[:4] != b'MThd':
-        raise ValueError("Not a valid MIDI file")
 
-    all_text_bytes = bytearray()
-    pos = 8 + struct.unpack('>I', data[4:8])[0]
+def _text_payloads(data) -> Iterator[bytes]:
+    raw = data.obj
+    data_len = len(data)
+    pos = 8 + _U32_BE.unpack_from(data, 4)[0]
 
-    while pos < len(data):
+    while pos + 8 <= data_len:
         if data[pos:pos+4] != b'MTrk':
             break
-        pos += 4
-        track_length = struct.unpack('>I', data[pos:pos+4])[0]
-        pos += 4
-        track_end = pos + track_length
-
-        while pos < track_end:
-            while pos < len(data) and data[pos] & 0x80:
-                pos += 1
-            if pos >= len(data):
-                break
-            pos += 1
-
-            if pos >= len(data):
-                break
-            status = data[pos]
-
-            if status == 0xFF:
-                pos += 1
-                if pos >= len(data):
-                    break
-                meta_type = data[pos]
-                pos += 1
-                length = 0
-                while pos < len(data) and data[pos] & 0x80:
-                    length = (length << 7) | (data[pos] & 0x7F)
-                    pos += 1
-                if pos >= len(data):
-                    break
-                length = (length << 7) | data[pos]
-                pos += 1
+        track_length = _U32_BE.unpack_from(data, pos + 4)[0]
+        pos += 8
+        spans = []
+        try:
+            _, pos = _scan_track(data, pos, min(pos + track_length, data_len), spans)
+        except IndexError:
+            pos = data_len
+        for _, _, text_start, text_end in spans:
+            if text_end > text_start:
+                yield raw[text_start:text_end]
 
-                if meta_type in (0x01, 0x02, 0x03, 0x04, 0x05, 0x06, 0x07):
-                    all_text_bytes.extend(data[pos:pos + length])
-                pos += length
-            elif status == 0xF0 or status == 0xF7:
-                pos += 1
-                length = 0
-                while pos < len(data) and data[pos] & 0x80:
-                    length = (length << 7) | (data[pos] & 0x7F)
-                    pos += 1
-                if pos >= len(data):
-                    break
-                length = (length << 7) | data[pos]
-                pos += 1
-                pos += length
-            elif status & 0x80:
-                pos += 1
-                if status & 0xF0 in (0x80, 0x90, 0xA0, 0xB0, 0xE0):
-                    pos += 2
-                elif status & 0xF0 in (0xC0, 0xD0):
-                    pos += 1
-            else:
-                pos += 1
 
-    if all_text_bytes:
-        results = chardet.detect_all(bytes(all_text_bytes))
-        return [(r['encoding'], r['confidence']) for r in results if r['encoding']]
+def detect_encoding(input_file: str,
+                    max_text_bytes: int = 65536) -> List[Tuple[str, float]]:
+    """检测MIDI文件中文本的编码"""
+    with _map_input(input_file) as data:
+        if data[:4] != b'MThd':
+            raise ValueError("Not a valid MIDI file")
 
-    return []
+        return _detect_text(_text_payloads(data), max_text_bytes)
 
 
 # ============== GUI 模块 ==============
@@ -368,7 +606,7 @@ def detect_encoding(input_file: str) -> List[Tuple[str, float]]:
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QPushButton, QComboBox, QFileDialog, QTextEdit,
-    QProgressBar, QFrame, QGridLayout, QMessageBox
+    QProgressBar, QFrame, QGridLayout, QMessageBox, QCheckBox
 )
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from PyQt6.QtGui import QDragEnterEvent, QDropEvent
@@ -518,6 +756,29 @@ QComboBox QAbstractItemView {{
     padding: 4px;
 }}
 
+QCheckBox {{
+    color: {COLORS['text']};
+    font-size: 14px;
+    spacing: 8px;
+}}
+
+QCheckBox::indicator {{
+    width: 20px;
+    height: 20px;
+    border-radius: 4px;
+    border: 2px solid {COLORS['border']};
+    background-color: {COLORS['surface']};
+}}
+
+QCheckBox::indicator:hover {{
+    border-color: {COLORS['primary']};
+}}
+
+QCheckBox::indicator:checked {{
+    background-color: {COLORS['primary']};
+    border-color: {COLORS['primary']};
+}}
+
 QTextEdit {{
     background-color: {COLORS['surface']};
     color: {COLORS['text']};
@@ -578,47 +839,100 @@ QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {{
 }}
 """
 
+# 控件级样式在导入时格式化一次，运行时直接复用
+_DROP_TEXT_QSS = f"color: {COLORS['text_secondary']}; font-size: 16px;"
+_DROP_HINT_QSS = f"color: {COLORS['text_muted']}; font-size: 13px;"
+_FIELD_LABEL_QSS = f"color: {COLORS['text_secondary']};"
+_ARROW_QSS = f"font-size: 20px; color: {COLORS['primary']};"
+_FOOTER_QSS = f"color: {COLORS['text_muted']}; font-size: 12px; padding-top: 8px;"
+_FILE_LABEL_IDLE_QSS = f"color: {COLORS['text_muted']}; padding: 8px 0;"
+_FILE_LABEL_SELECTED_QSS = f"color: {COLORS['success']}; padding: 8px 0;"
+_DROPZONE_ACTIVE_QSS = (
+    f"QFrame#dropZone {{ border-color: {COLORS['primary']}; "
+    f"background-color: rgba(99, 102, 241, 0.15); }}"
+)
+_DROPZONE_IDLE_QSS = ""
+
+_MIDI_EXTS = ('.mid', '.midi')
+
+# 检测置信度达到该值时，日志只显示首选编码
+_CONFIDENT_DETECTION = 0.95
+
+# 编码候选列表在导入时创建一次
+_FROM_ENCODINGS = (
+    "shift_jis", "cp932", "gbk", "gb2312", "gb18030",
+    "big5", "euc-kr", "cp949", "utf-8", "utf-16",
+    "iso-8859-1", "cp1252", "ascii",
+)
+_TO_ENCODINGS = (
+    "utf-8", "utf-16", "shift_jis", "cp932", "gbk",
+    "gb2312", "gb18030", "big5", "euc-kr", "cp949",
+    "iso-8859-1", "cp1252", "ascii",
+)
+
 
 class ConversionWorker(QThread):
     progress = pyqtSignal(int)
-    finished = pyqtSignal(dict)
+    converted = pyqtSignal(dict)
     error = pyqtSignal(str)
     log = pyqtSignal(str)
 
-    def __init__(self, input_file, output_file, from_encoding, to_encoding):
+    def __init__(self, input_file, output_file, from_encoding, to_encoding, auto_detect=False):
         super().__init__()
         self.input_file = input_file
         self.output_file = output_file
         self.from_encoding = from_encoding
         self.to_encoding = to_encoding
+        self.auto_detect = auto_detect
+
+    def configure(self, input_file, output_file, from_encoding, to_encoding, auto_detect=False):
+        self.input_file = input_file
+        self.output_file = output_file
+        self.from_encoding = from_encoding
+        self.to_encoding = to_encoding
+        # 为 True 时在转换的同一遍扫描中检测源编码，from_encoding 作为检测失败时的后备
+        self.auto_detect = auto_detect
 
     def run(self):
+        # 开始时一次取齐日志文本，转换途中切换语言也不会混用
+        (starting, input_label, encoding_label, complete, output_label,
+         track_label, text_label, size_label, bytes_label, source_label, auto_label) = map(tr, (
+            'starting', 'input_file', 'encoding_convert', 'complete', 'output_file',
+            'track_count', 'text_events', 'file_size', 'bytes', 'set_source_encoding', 'auto'))
+        source = auto_label if self.auto_detect else self.from_encoding
         try:
-            self.log.emit(f"{tr('starting')}")
-            self.log.emit(f"{tr('input_file')}: {self.input_file}")
-            self.log.emit(f"{tr('encoding_convert')}: {self.from_encoding} -> {self.to_encoding}")
+            self.log.emit("\n".join((
+                starting,
+                f"{input_label}: {self.input_file}",
+                f"{encoding_label}: {source} -> {self.to_encoding}",
+            )))
             self.progress.emit(20)
 
             converter = MidiEncodingConverter(self.from_encoding, self.to_encoding)
             self.progress.emit(40)
-            result = converter.convert(self.input_file, self.output_file)
+            result = converter.convert(self.input_file, self.output_file,
+                                       auto_detect=self.auto_detect)
             self.progress.emit(80)
+            if self.auto_detect:
+                self.log.emit(f"{source_label} {result['from_encoding']}")
 
-            self.log.emit(f"\n{tr('complete')}")
-            self.log.emit(f"  {tr('output_file')}: {result['output_file']}")
-            self.log.emit(f"  {tr('track_count')}: {result['tracks']}")
-            self.log.emit(f"  {tr('text_events')}: {result['converted']}")
-            self.log.emit(f"  {tr('file_size')}: {result['input_size']} -> {result['output_size']} {tr('bytes')}")
+            self.log.emit("\n".join((
+                f"\n{complete}",
+                f"  {output_label}: {result['output_file']}",
+                f"  {track_label}: {result['tracks']}",
+                f"  {text_label}: {result['converted']}",
+                f"  {size_label}: {result['input_size']} -> {result['output_size']} {bytes_label}",
+            )))
 
             self.progress.emit(100)
-            self.finished.emit(result)
+            self.converted.emit(result)
 
         except Exception as e:
             self.error.emit(str(e))
 
 
 class DetectionWorker(QThread):
-    finished = pyqtSignal(list)
+    detected = pyqtSignal(list)
     error = pyqtSignal(str)
     log = pyqtSignal(str)
 
@@ -626,19 +940,25 @@ class DetectionWorker(QThread):
         super().__init__()
         self.input_file = input_file
 
+    def configure(self, input_file):
+        self.input_file = input_file
+
     def run(self):
         try:
             self.log.emit(f"{tr('detecting')}")
             results = detect_encoding(self.input_file)
 
-            if results:
-                self.log.emit(f"\n{tr('detected_encodings')}")
-                for encoding, confidence in results:
-                    self.log.emit(f"  - {encoding}: {confidence:.1%}")
+            if results and results[0][1] >= _CONFIDENT_DETECTION:
+                encoding, confidence = results[0]
+                self.log.emit(f"\n{tr('detected_encodings')} {encoding} ({confidence:.1%})")
+            elif results:
+                lines = [f"\n{tr('detected_encodings')}"]
+                lines.extend(f"  - {encoding}: {confidence:.1%}" for encoding, confidence in results)
+                self.log.emit("\n".join(lines))
             else:
                 self.log.emit(tr('no_encoding_detected'))
 
-            self.finished.emit(results)
+            self.detected.emit(results)
 
         except Exception as e:
             self.error.emit(str(e))
@@ -651,6 +971,7 @@ class DropZone(QFrame):
         super().__init__(parent)
         self.setObjectName("dropZone")
         self.setAcceptDrops(True)
+        self._highlighted = False
         self.init_ui()
 
     def init_ui(self):
@@ -663,12 +984,12 @@ class DropZone(QFrame):
         layout.addWidget(self.icon_label)
 
         self.text_label = QLabel(tr('drop_hint'))
-        self.text_label.setStyleSheet(f"color: {COLORS['text_secondary']}; font-size: 16px;")
+        self.text_label.setStyleSheet(_DROP_TEXT_QSS)
         self.text_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(self.text_label)
 
         self.hint_label = QLabel(tr('drop_hint2'))
-        self.hint_label.setStyleSheet(f"color: {COLORS['text_muted']}; font-size: 13px;")
+        self.hint_label.setStyleSheet(_DROP_HINT_QSS)
         self.hint_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(self.hint_label)
 
@@ -676,26 +997,28 @@ class DropZone(QFrame):
         self.text_label.setText(tr('drop_hint'))
         self.hint_label.setText(tr('drop_hint2'))
 
+    def set_highlighted(self, highlighted):
+        # 状态未变化时不重新设置样式，避免 Qt 重复解析 QSS
+        if highlighted != self._highlighted:
+            self._highlighted = highlighted
+            self.setStyleSheet(_DROPZONE_ACTIVE_QSS if highlighted else _DROPZONE_IDLE_QSS)
+
     def dragEnterEvent(self, event: QDragEnterEvent):
-        if event.mimeData().hasUrls():
-            url = event.mimeData().urls()[0]
-            if url.toLocalFile().lower().endswith(('.mid', '.midi')):
+        mime_data = event.mimeData()
+        if mime_data.hasUrls():
+            file_path = mime_data.urls()[0].toLocalFile().lower()
+            if file_path.endswith(_MIDI_EXTS):
                 event.acceptProposedAction()
-                self.setStyleSheet(f"""
-                    QFrame#dropZone {{
-                        border-color: {COLORS['primary']};
-                        background-color: rgba(99, 102, 241, 0.15);
-                    }}
-                """)
+                self.set_highlighted(True)
 
     def dragLeaveEvent(self, event):
-        self.setStyleSheet("")
+        self.set_highlighted(False)
 
     def dropEvent(self, event: QDropEvent):
-        self.setStyleSheet("")
+        self.set_highlighted(False)
         url = event.mimeData().urls()[0]
         file_path = url.toLocalFile()
-        if file_path.lower().endswith(('.mid', '.midi')):
+        if file_path.lower().endswith(_MIDI_EXTS):
             self.fileDropped.emit(file_path)
 
 
@@ -704,10 +1027,26 @@ class MainWindow(QMainWindow):
         super().__init__()
         self.input_file = None
         self.output_file = None
-        self.worker = None
         self.detected_encoding = None
+        # 检测线程忙时又选择了新文件，等它结束后再检测
+        self._detection_pending = False
+        # 上次显示的进度，重复的进度信号直接忽略
+        self._last_pct = -1
         self.init_ui()
 
+        # 工作线程复用，信号只连接一次
+        self.conversion_worker = ConversionWorker("", "", "", "")
+        self.conversion_worker.progress.connect(self.update_progress)
+        self.conversion_worker.log.connect(self.log_message)
+        self.conversion_worker.converted.connect(self.on_conversion_finished)
+        self.conversion_worker.error.connect(self.on_error)
+
+        self.detection_worker = DetectionWorker("")
+        self.detection_worker.log.connect(self.log_message)
+        self.detection_worker.detected.connect(self.on_detection_finished)
+        self.detection_worker.error.connect(self.on_detection_error)
+        self.detection_worker.finished.connect(self.on_detection_thread_finished)
+
     def init_ui(self):
         self.setWindowTitle(tr('app_title'))
         self.setMinimumSize(800, 700)
@@ -780,7 +1119,7 @@ class MainWindow(QMainWindow):
         file_section_layout.addLayout(browse_layout)
 
         self.file_label = QLabel(tr('no_file'))
-        self.file_label.setStyleSheet(f"color: {COLORS['text_muted']}; padding: 8px 0;")
+        self.file_label.setStyleSheet(_FILE_LABEL_IDLE_QSS)
         self.file_label.setWordWrap(True)
         file_section_layout.addWidget(self.file_label)
 
@@ -801,37 +1140,34 @@ class MainWindow(QMainWindow):
         encoding_grid.setSpacing(12)
 
         self.from_label = QLabel(tr('source_encoding'))
-        self.from_label.setStyleSheet(f"color: {COLORS['text_secondary']};")
+        self.from_label.setStyleSheet(_FIELD_LABEL_QSS)
         encoding_grid.addWidget(self.from_label, 0, 0)
 
         self.from_encoding = QComboBox()
-        self.from_encoding.addItems([
-            tr('auto'),
-            "shift_jis", "cp932", "gbk", "gb2312", "gb18030",
-            "big5", "euc-kr", "cp949", "utf-8", "utf-16",
-            "iso-8859-1", "cp1252", "ascii"
-        ])
+        self.from_encoding.addItem(tr('auto'))
+        self.from_encoding.addItems(_FROM_ENCODINGS)
         encoding_grid.addWidget(self.from_encoding, 0, 1)
 
         arrow_label = QLabel("→")
-        arrow_label.setStyleSheet(f"font-size: 20px; color: {COLORS['primary']};")
+        arrow_label.setStyleSheet(_ARROW_QSS)
         arrow_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         encoding_grid.addWidget(arrow_label, 0, 2)
 
         self.to_label = QLabel(tr('target_encoding'))
-        self.to_label.setStyleSheet(f"color: {COLORS['text_secondary']};")
+        self.to_label.setStyleSheet(_FIELD_LABEL_QSS)
         encoding_grid.addWidget(self.to_label, 0, 3)
 
         self.to_encoding = QComboBox()
-        self.to_encoding.addItems([
-            "utf-8", "utf-16", "shift_jis", "cp932", "gbk",
-            "gb2312", "gb18030", "big5", "euc-kr", "cp949",
-            "iso-8859-1", "cp1252", "ascii"
-        ])
+        self.to_encoding.addItems(_TO_ENCODINGS)
         encoding_grid.addWidget(self.to_encoding, 0, 4)
 
         encoding_section_layout.addLayout(encoding_grid)
 
+        # 自动命名：直接保存为 "原文件名_converted"，不再弹出保存对话框
+        self.auto_name_check = QCheckBox(tr('auto_name_output'))
+        self.auto_name_check.setChecked(False)
+        encoding_section_layout.addWidget(self.auto_name_check)
+
         left_layout.addWidget(encoding_section)
 
         # 转换按钮
@@ -888,13 +1224,12 @@ class MainWindow(QMainWindow):
 
         # 页脚
         self.footer_label = QLabel(tr('footer'))
-        self.footer_label.setStyleSheet(f"color: {COLORS['text_muted']}; font-size: 12px; padding-top: 8px;")
+        self.footer_label.setStyleSheet(_FOOTER_QSS)
         self.footer_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         main_layout.addWidget(self.footer_label)
 
     def toggle_language(self):
-        global current_language
-        current_language = 'en' if current_language == 'zh' else 'zh'
+        set_language('en' if current_language == 'zh' else 'zh')
         self.update_ui_language()
 
     def update_ui_language(self):
@@ -908,6 +1243,7 @@ class MainWindow(QMainWindow):
         self.encoding_title.setText(tr('encoding_settings'))
         self.from_label.setText(tr('source_encoding'))
         self.to_label.setText(tr('target_encoding'))
+        self.auto_name_check.setText(tr('auto_name_output'))
         self.convert_btn.setText(tr('start_convert'))
         self.log_title.setText(tr('output_log'))
         self.clear_log_btn.setText(tr('clear'))
@@ -929,10 +1265,10 @@ class MainWindow(QMainWindow):
             self.on_file_selected(file_path)
 
     def on_file_selected(self, file_path):
-        self.input_file = file_path
-        file_name = Path(file_path).name
+        self.input_file = Path(file_path)
+        file_name = self.input_file.name
         self.file_label.setText(f"{tr('file_selected')} {file_name}")
-        self.file_label.setStyleSheet(f"color: {COLORS['success']}; padding: 8px 0;")
+        self.file_label.setStyleSheet(_FILE_LABEL_SELECTED_QSS)
         self.convert_btn.setEnabled(True)
         self.log_message(f"{tr('selected_file')}: {file_path}")
 
@@ -943,63 +1279,85 @@ class MainWindow(QMainWindow):
         if not self.input_file:
             return
 
-        self.worker = DetectionWorker(self.input_file)
-        self.worker.log.connect(self.log_message)
-        self.worker.finished.connect(self.on_detection_finished)
-        self.worker.error.connect(self.on_error)
-        self.worker.start()
+        self.detected_encoding = None
+        # 上一次检测尚未结束时不阻塞界面，线程结束后再检测新文件
+        if self.detection_worker.isRunning():
+            self._detection_pending = True
+            return
+        self._detection_pending = False
+        self.detection_worker.configure(str(self.input_file))
+        self.detection_worker.start()
+
+    def on_detection_thread_finished(self):
+        if self._detection_pending:
+            self.auto_detect_encoding()
+
+    def on_detection_error(self, error_msg):
+        # 已被新文件取代的检测结果直接丢弃
+        if not self._detection_pending:
+            self.on_error(error_msg)
 
     def on_detection_finished(self, results):
+        if self._detection_pending:
+            return
         if results:
             best_encoding = results[0][0].lower().replace('-', '_')
             self.detected_encoding = best_encoding
             self.log_message(f"\n{tr('set_source_encoding')} {best_encoding}")
 
     def start_conversion(self):
-        if not self.input_file:
+        if not self.input_file or self.conversion_worker.isRunning():
             return
 
-        input_path = Path(self.input_file)
-        self.output_file = str(input_path.parent / f"{input_path.stem}_converted{input_path.suffix}")
+        default_output = self.input_file.with_name(
+            f"{self.input_file.stem}_converted{self.input_file.suffix}")
+        self.output_file = str(default_output)
 
-        output_path, _ = QFileDialog.getSaveFileName(
-            self,
-            tr('save_midi_file'),
-            self.output_file,
-            f"{tr('midi_files')} (*.mid *.midi);;{tr('all_files')} (*.*)"
-        )
+        # 勾选自动命名且不会覆盖已有文件时跳过对话框，否则询问用户保存位置
+        auto_named = self.auto_name_check.isChecked() and not default_output.exists()
+        if not auto_named:
+            output_path, _ = QFileDialog.getSaveFileName(
+                self,
+                tr('save_midi_file'),
+                self.output_file,
+                f"{tr('midi_files')} (*.mid *.midi);;{tr('all_files')} (*.*)"
+            )
 
-        if not output_path:
-            return
+            if not output_path:
+                return
 
-        self.output_file = output_path
+            self.output_file = output_path
 
         # 确定源编码
         from_enc = self.from_encoding.currentText()
+        auto_detect = False
         if from_enc == tr('auto') or from_enc == '自动检测' or from_enc == 'Auto Detect':
             if self.detected_encoding:
                 from_enc = self.detected_encoding
             else:
+                # 检测尚无结果时，由转换线程在同一遍扫描中检测
                 from_enc = 'utf-8'
+                auto_detect = True
 
         self.convert_btn.setEnabled(False)
         self.browse_btn.setEnabled(False)
         self.progress_bar.setVisible(True)
         self.progress_bar.setValue(0)
+        self._last_pct = 0
 
-        self.worker = ConversionWorker(
-            self.input_file,
+        self.conversion_worker.configure(
+            str(self.input_file),
             self.output_file,
             from_enc,
-            self.to_encoding.currentText()
+            self.to_encoding.currentText(),
+            auto_detect
         )
-        self.worker.progress.connect(self.update_progress)
-        self.worker.log.connect(self.log_message)
-        self.worker.finished.connect(self.on_conversion_finished)
-        self.worker.error.connect(self.on_error)
-        self.worker.start()
+        self.conversion_worker.start()
 
     def update_progress(self, value):
+        if value == self._last_pct:
+            return
+        self._last_pct = value
         self.progress_bar.setValue(value)
 
     def on_conversion_finished(self, result):
@@ -1030,9 +1388,11 @@ class MainWindow(QMainWindow):
         )
 
     def log_message(self, message):
+        self.log_output.setUpdatesEnabled(False)
         self.log_output.append(message)
         scrollbar = self.log_output.verticalScrollBar()
         scrollbar.setValue(scrollbar.maximum())
+        self.log_output.setUpdatesEnabled(True)
 
     def clear_log(self):
         self.log_output.clear()
@@ -11,14 +11,354 @@ License: MIT
 Version: 1.0.0
 """
 
+import codecs
+import io
+import mmap
+import os
+import shutil
 import struct
 import argparse
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import freeze_support
 from pathlib import Path
-from typing import Tuple, List, Optional
+from typing import Iterable, Iterator, Tuple, List, Optional
 
 __version__ = "1.0.0"
 
+# Max distinct payloads remembered by MidiEncodingConverter.convert_text
+_TEXT_CACHE_SIZE = 4096
+
+# Output buffer size; large enough that most files go out in one syscall
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# Big-endian 32-bit chunk lengths (MThd/MTrk)
+_U32_BE = struct.Struct('>I')
+
+# 7-bit ASCII, used to probe whether a codec leaves ASCII bytes unchanged
+_ASCII_BYTES = bytes(range(128))
+_ASCII_TEXT = _ASCII_BYTES.decode('ascii')
+
+# Escape and shift sequences of the stateful 7-bit codecs (ISO-2022, HZ,
+# UTF-7); an ASCII-compatible codec must decode these as plain ASCII too
+_SHIFT_PROBE = b'\x1b$B$"\x1b(B\x1b$)C\x0e!!\x0f~{!!~}+AGE-'
+_SHIFT_PROBE_TEXT = _SHIFT_PROBE.decode('ascii')
+
+# Data bytes following each channel status byte (0 for system messages)
+_EVENT_DATA_LEN = bytes(2 if (i & 0xF0) in (0x80, 0x90, 0xA0, 0xB0, 0xE0)
+                         else 1 if (i & 0xF0) in (0xC0, 0xD0) else 0
+                         for i in range(256))
+
+# Encoded 1- and 2-byte quantities (values below 0x4000), by value
+_VLQ_SMALL = tuple([bytes((i,)) for i in range(0x80)] +
+                   [bytes((0x80 | (i >> 7), i & 0x7F)) for i in range(0x80, 0x4000)])
+
+
+@contextmanager
+def _map_input(path):
+    """
+    Map a file read-only and yield a memoryview over its contents.
+
+    Slices of the view read straight from the page cache instead of a
+    private copy of the file; slicing view.obj (the mapping) returns bytes.
+    Empty files cannot be mapped and yield an empty view instead.
+
+    Args:
+        path: Path to the file
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield memoryview(b'')
+            return
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    # Files are walked front to back; let the kernel read ahead
+    # (madvise is not available on Windows)
+    if hasattr(mmap, 'MADV_SEQUENTIAL'):
+        mm.madvise(mmap.MADV_SEQUENTIAL)
+    view = memoryview(mm)
+    try:
+        yield view
+    finally:
+        view.release()
+        mm.close()
+
+
+def _read_vlq(data, pos: int) -> Tuple[int, int]:
+    """
+    Read a variable-length quantity from MIDI data.
+
+    Shared by the converter and detect_encoding.
+
+    Args:
+        data: MIDI file data
+        pos: Current position
+
+    Returns:
+        Tuple of (value, new_position)
+
+    Raises:
+        ValueError: If the quantity runs past the 4 bytes MIDI allows
+    """
+    # One-byte values (most delta times and lengths) need no loop
+    value = data[pos]
+    if value < 0x80:
+        return value, pos + 1
+    # Longer values are unrolled up to the 4 bytes MIDI allows
+    byte = data[pos + 1]
+    value = ((value & 0x7F) << 7) | (byte & 0x7F)
+    if byte < 0x80:
+        return value, pos + 2
+    byte = data[pos + 2]
+    value = (value << 7) | (byte & 0x7F)
+    if byte < 0x80:
+        return value, pos + 3
+    byte = data[pos + 3]
+    value = (value << 7) | (byte & 0x7F)
+    if byte < 0x80:
+        return value, pos + 4
+    # A fifth continuation byte means a corrupt file
+    raise ValueError("Variable-length quantity longer than 4 bytes")
+
+
+def _lookup_codec(encoding: str) -> Tuple[codecs.CodecInfo, bool]:
+    """
+    Resolve a codec once, for reuse on every text event.
+
+    A single codecs.lookup provides both codec functions and the canonical
+    name. Unknown encodings give a CodecInfo named None whose functions
+    raise LookupError when called, so convert_text still counts them as
+    conversion errors.
+
+    Args:
+        encoding: Codec name
+
+    Returns:
+        Tuple of (codec_info, ascii_compatible), the latter telling the
+        passthrough shortcuts in convert_text whether ASCII is unchanged
+    """
+    try:
+        info = codecs.lookup(encoding)
+    except LookupError as e:
+        error = e
+
+        def unknown(*args):
+            raise error
+        return codecs.CodecInfo(unknown, unknown, name=None), False
+    try:
+        ascii_compatible = (_ASCII_BYTES.decode(encoding) == _ASCII_TEXT
+                            and _ASCII_TEXT.encode(encoding) == _ASCII_BYTES)
+    except UnicodeError:
+        # A text codec that cannot represent raw ASCII (HZ, UTF-7)
+        ascii_compatible = False
+    except LookupError:
+        # Not a text encoding (e.g. hex); never treat it as a passthrough
+        info = codecs.CodecInfo(info.encode, info.decode, name=None)
+        ascii_compatible = False
+    if ascii_compatible:
+        # ISO-2022-JP maps every single ASCII byte to itself, yet its
+        # Japanese text is pure 7-bit, so ASCII payloads still need converting
+        try:
+            ascii_compatible = _SHIFT_PROBE.decode(encoding) == _SHIFT_PROBE_TEXT
+        except UnicodeError:
+            ascii_compatible = False
+    return info, ascii_compatible
+
+
+def _text_sample(payloads: Iterable[bytes], max_text_bytes: int) -> bytes:
+    """
+    Join whole payloads into one detection sample.
+
+    Args:
+        payloads: Raw text payloads, in file order
+        max_text_bytes: Text budget; the last payload may go past it
+
+    Returns:
+        The joined payloads
+    """
+    sample = bytearray()
+    for payload in payloads:
+        sample += payload
+        if len(sample) >= max_text_bytes:
+            break
+    return bytes(sample)
+
+
+def _detect_cchardet(payloads: Iterable[bytes], max_text_bytes: int) -> List[Tuple[str, float]]:
+    """Detect with cchardet over one joined sample."""
+    sample = _text_sample(payloads, max_text_bytes)
+    if not sample:
+        return []
+    result = cchardet.detect(sample)
+    if result['encoding']:
+        return [(result['encoding'], result['confidence'] or 0.0)]
+    return []
+
+
+def _detect_charset_normalizer(payloads: Iterable[bytes],
+                               max_text_bytes: int) -> List[Tuple[str, float]]:
+    """Detect with charset_normalizer over one joined sample."""
+    sample = _text_sample(payloads, max_text_bytes)
+    if not sample:
+        return []
+    return [(match.encoding, 1.0 - match.chaos) for match in from_bytes(sample)]
+
+
+def _detect_chardet(payloads: Iterable[bytes], max_text_bytes: int) -> List[Tuple[str, float]]:
+    """Detect with chardet, feeding payloads until the detector is sure."""
+    detector = chardet.UniversalDetector()
+    fed = 0
+    for payload in payloads:
+        detector.feed(payload)
+        fed += len(payload)
+        if detector.done or fed >= max_text_bytes:
+            break
+    if not fed:
+        return []
+    detector.close()
+    result = detector.result
+    if result['encoding']:
+        return [(result['encoding'], result['confidence'])]
+    return []
+
+
+# Encoding detector, resolved once: the fastest one installed, or None
+try:
+    import cchardet
+    _DETECTOR = _detect_cchardet
+except ImportError:
+    try:
+        from charset_normalizer import from_bytes
+        _DETECTOR = _detect_charset_normalizer
+    except ImportError:
+        try:
+            import chardet
+            _DETECTOR = _detect_chardet
+        except ImportError:
+            _DETECTOR = None
+
+
+def _detect_text(payloads: Iterable[bytes], max_text_bytes: int) -> List[Tuple[str, float]]:
+    """
+    Run the installed encoding detector over text payloads.
+
+    The detector is picked at import, fastest first: cchardet,
+    charset_normalizer, then chardet. Whole payloads are taken until
+    max_text_bytes is reached, so no multi-byte character is cut in half;
+    with chardet, payloads also stop being consumed as soon as the
+    detector is sure.
+
+    Args:
+        payloads: Raw text payloads, in file order
+        max_text_bytes: Text budget; the last payload may go past it
+
+    Returns:
+        List of (encoding, confidence) tuples
+    """
+    if _DETECTOR is None:
+        print("Warning: no encoding detector installed. Install with: "
+              "pip install charset-normalizer (or chardet)", file=sys.stderr)
+        return []
+    return _DETECTOR(payloads, max_text_bytes)
+
+
+def _scan_track(data, pos: int, end: int, spans: Optional[list] = None) -> Tuple[list, int]:
+    """
+    Walk the events of one track and locate its text meta events.
+
+    Nothing is copied here; the caller copies everything between the
+    returned spans as plain slices and only re-encodes the text.
+
+    Args:
+        data: MIDI file data
+        pos: Position of the first event in the track
+        end: Position where the track data ends
+        spans: List to append spans to (a new one by default); passing one
+            keeps the spans found before an IndexError on truncated data
+
+    Returns:
+        Tuple of (spans, new_position), each span being
+        (meta_type, length_pos, text_start, text_end)
+    """
+    if spans is None:
+        spans = []
+    running_status = 0
+    # Locals instead of globals/attributes in the per-event loop
+    event_len = _EVENT_DATA_LEN
+    is_text = _IS_TEXT_META
+    read_vlq = _read_vlq
+    add_span = spans.append
+
+    while pos < end:
+        # Skip delta time
+        while data[pos] & 0x80:
+            pos += 1
+        pos += 1
+
+        status = data[pos]
+
+        # Branches ordered by how common each event kind is
+        if status < 0x80:  # Running status (or an unknown data byte)
+            pos += event_len[running_status] or 1
+
+        elif status < 0xF0:  # Channel event
+            running_status = status
+            pos += 1 + event_len[status]
+
+        elif status == 0xFF:  # Meta event
+            meta_type = data[pos + 1]
+            pos += 2
+            length_pos = pos
+            # Lengths almost always fit in one VLQ byte; skip the call then
+            length = data[pos]
+            if length < 0x80:
+                pos += 1
+            else:
+                length, pos = read_vlq(data, pos)
+            if is_text[meta_type]:
+                add_span((meta_type, length_pos, pos, pos + length))
+            pos += length
+
+        elif status == 0xF0 or status == 0xF7:  # SysEx
+            pos += 1
+            length = data[pos]
+            if length < 0x80:
+                pos += 1
+            else:
+                length, pos = read_vlq(data, pos)
+            pos += length
+            running_status = 0
+
+        else:  # Other system messages carry no data bytes
+            running_status = status
+            pos += 1
+
+    return spans, pos
+
+
+def _write_tracks(write, data, header_end: int, tracks: list) -> None:
+    """
+    Write a converted MIDI file as planned by MidiEncodingConverter._plan.
+
+    Everything outside the replacements is written as slices of data, so
+    a memoryview over a mapping goes out without an intermediate copy.
+
+    Args:
+        write: Callable taking each piece of output in order
+        data: Original MIDI data
+        header_end: Position where the header chunk ends
+        tracks: List of (read_pos, track_stop, track_size, replacements)
+    """
+    write(data[:header_end])
+    for read_pos, track_stop, track_size, replacements in tracks:
+        write(b'MTrk' + _U32_BE.pack(track_size))
+        for length_pos, text_end, length_vlq, new_data in replacements:
+            write(data[read_pos:length_pos])
+            write(length_vlq)
+            write(new_data)
+            read_pos = text_end
+        write(data[read_pos:track_stop])
+
 
 class MidiEncodingConverter:
     """Convert text event encodings in MIDI files."""
@@ -34,6 +374,14 @@ class MidiEncodingConverter:
         0x07: "Cue Point",
     }
 
+    # Created per file by convert_many workers; no per-instance __dict__
+    __slots__ = (
+        'converted_count', 'error_count', 'verbose',
+        '_from_encoding', '_to_encoding', '_decode', '_encode',
+        '_from_name', '_to_name', '_from_ascii', '_to_ascii',
+        '_same_encoding', '_ascii_passthrough', '_cache',
+    )
+
     def __init__(self, from_encoding: str = "shift_jis", to_encoding: str = "utf-8"):
         """
         Initialize the converter.
@@ -42,12 +390,45 @@ class MidiEncodingConverter:
             from_encoding: Source encoding (default: shift_jis)
             to_encoding: Target encoding (default: utf-8)
         """
+        # Raw payload -> converted bytes, cleared on every convert()
+        # and whenever an encoding changes
+        self._cache = {}
+        self._from_name = self._to_name = None
+        self._from_ascii = self._to_ascii = False
         self.from_encoding = from_encoding
         self.to_encoding = to_encoding
         self.converted_count = 0
         self.error_count = 0
         self.verbose = False
 
+    @property
+    def from_encoding(self) -> str:
+        """Source encoding; setting it re-resolves the cached decoder."""
+        return self._from_encoding
+
+    @from_encoding.setter
+    def from_encoding(self, value: str):
+        self._from_encoding = value
+        info, self._from_ascii = _lookup_codec(value)
+        self._decode = info.decode
+        self._from_name = info.name
+        self._update_passthrough()
+        self._cache.clear()
+
+    @property
+    def to_encoding(self) -> str:
+        """Target encoding; setting it re-resolves the cached encoder."""
+        return self._to_encoding
+
+    @to_encoding.setter
+    def to_encoding(self, value: str):
+        self._to_encoding = value
+        info, self._to_ascii = _lookup_codec(value)
+        self._encode = info.encode
+        self._to_name = info.name
+        self._update_passthrough()
+        self._cache.clear()
+
     @staticmethod
     def read_variable_length(data: bytes, pos: int) -> Tuple[int, int]:
         """
@@ -60,14 +441,7 @@ class MidiEncodingConverter:
         Returns:
             Tuple of (value, new_position)
         """
-        value = 0
-        while True:
-            byte = data[pos]
-            value = (value << 7) | (byte & 0x7F)
-            pos += 1
-            if not (byte & 0x80):
-                break
-        return value, pos
+        return _read_vlq(data, pos)
 
     @staticmethod
     def write_variable_length(value: int) -> bytes:
@@ -80,39 +454,199 @@ class MidiEncodingConverter:
         Returns:
             Encoded bytes
         """
-        result = [value & 0x7F]
-        value >>= 7
-        while value:
-            result.append((value & 0x7F) | 0x80)
-            value >>= 7
-        return bytes(reversed(result))
+        # Table lookup for 1-2 bytes, then unrolled up to the 4 bytes MIDI allows
+        if 0 <= value < 0x4000:
+            return _VLQ_SMALL[value]
+        if value < 0x200000:
+            return bytes((0x80 | (value >> 14), 0x80 | ((value >> 7) & 0x7F), value & 0x7F))
+        if value < 0x10000000:
+            return bytes((0x80 | (value >> 21), 0x80 | ((value >> 14) & 0x7F),
+                          0x80 | ((value >> 7) & 0x7F), value & 0x7F))
+        # Longer than MIDI allows; written MSB first, 7 bits at a time
+        shift = (value.bit_length() - 1) // 7 * 7
+        buf = bytearray()
+        while shift:
+            buf.append(0x80 | ((value >> shift) & 0x7F))
+            shift -= 7
+        buf.append(value & 0x7F)
+        return bytes(buf)
+
+    def _update_passthrough(self):
+        """Recompute which payloads convert_text can return unchanged."""
+        self._same_encoding = self._from_name is not None and self._from_name == self._to_name
+        self._ascii_passthrough = self._from_ascii and self._to_ascii
 
     def convert_text(self, data: bytes) -> bytes:
         """
         Convert text data from source encoding to target encoding.
 
         Args:
-            data: Original text bytes
+            data: Original text bytes (any bytes-like object)
 
         Returns:
             Converted text bytes
         """
+        # bytearray/memoryview input: the cache needs a hashable key
+        if type(data) is not bytes:
+            data = bytes(data)
+        # Nothing to do when the bytes would round-trip unchanged
+        if self._same_encoding or (self._ascii_passthrough and data.isascii()):
+            return data
         try:
-            text = data.decode(self.from_encoding, errors='replace')
-            return text.encode(self.to_encoding)
+            return self._cache[data]
+        except KeyError:
+            pass
+        try:
+            text = self._decode(data, 'replace')[0]
+            result = self._encode(text)[0]
         except Exception as e:
             self.error_count += 1
             if self.verbose:
                 print(f"Warning: Conversion error - {e}", file=sys.stderr)
             return data
+        # Only successes are cached so every failure is still counted
+        cache = self._cache
+        if len(cache) >= _TEXT_CACHE_SIZE:
+            del cache[next(iter(cache))]
+        cache[data] = result
+        return result
+
+    def _stats(self, track_count: int, input_size: int, output_size: int) -> dict:
+        """Build the statistics shared by convert() and convert_bytes()."""
+        return {
+            'from_encoding': self.from_encoding,
+            'tracks': track_count,
+            'converted': self.converted_count,
+            'errors': self.error_count,
+            'input_size': input_size,
+            'output_size': output_size,
+        }
+
+    def _plan(self, data, auto_detect: bool, max_text_bytes: int) -> Tuple[int, list, int, bool]:
+        """
+        Scan MIDI data and convert its text events, without writing anything.
+
+        Resets the counters; with auto_detect, from_encoding is set from
+        the text events found by the scan.
+
+        Args:
+            data: memoryview over the MIDI data; slicing data.obj gives bytes
+            auto_detect: Detect the source encoding before converting
+            max_text_bytes: Maximum number of text bytes used for detection
+
+        Returns:
+            Tuple of (header_end, tracks, output_size, unchanged) where tracks
+            holds (read_pos, track_stop, track_size, replacements) for
+            _write_tracks, and unchanged means the output equals the input
+        """
+        # Validate MIDI header
+        if data[:4] != b'MThd':
+            raise ValueError("Not a valid MIDI file (missing MThd header)")
+
+        self.converted_count = 0
+        self.error_count = 0
+        self._cache.clear()
+
+        # Slicing the underlying object yields bytes with a single copy
+        raw = data.obj
+        data_len = len(data)
+        header_end = 8 + _U32_BE.unpack_from(data, 4)[0]
+
+        # Pass 1: locate the text events of every track
+        scanned = []
+        pos = header_end
+        # Whether the file is exactly its header and well-formed tracks
+        intact = True
+        while pos < data_len:
+            if data[pos:pos+4] != b'MTrk':
+                intact = False
+                break
 
-    def convert(self, input_file: str, output_file: Optional[str] = None) -> dict:
+            track_length = _U32_BE.unpack_from(data, pos + 4)[0]
+            pos += 8
+            spans, track_stop = _scan_track(data, pos, pos + track_length)
+            if track_stop != pos + track_length:
+                intact = False
+            track_stop = min(track_stop, data_len)
+            scanned.append((pos, track_stop, spans))
+            pos = track_stop
+
+        # Detect the source encoding from the spans just found
+        if auto_detect:
+            results = _detect_text(
+                (raw[text_start:text_end]
+                 for _, _, spans in scanned
+                 for _, _, text_start, text_end in spans),
+                max_text_bytes)
+            if results:
+                self.from_encoding = results[0][0]
+
+        # Same codec on both sides and nothing outside the tracks: the
+        # output is the input byte for byte
+        if self._same_encoding and intact:
+            self.converted_count = sum(len(spans) for _, _, spans in scanned)
+            tracks = [(pos, track_stop, track_stop - pos, ()) for pos, track_stop, _ in scanned]
+            return header_end, tracks, data_len, True
+
+        # Pass 2: convert every text event, sizing the output
+        tracks = []
+        output_size = header_end
+        # Bound once for the per-event loop below
+        ascii_passthrough = self._ascii_passthrough
+        verbose = self.verbose
+        convert_text = self.convert_text
+        write_vlq = self.write_variable_length
+        for pos, track_stop, spans in scanned:
+            # Each replacement covers the length VLQ and the text itself
+            replacements = []
+            add_replacement = replacements.append
+            track_size = track_stop - pos
+            self.converted_count += len(spans)
+            for meta_type, length_pos, text_start, text_end in spans:
+                meta_data = raw[text_start:text_end]
+                # ASCII text both codecs agree on is copied without a call
+                if ascii_passthrough and text_end <= data_len and meta_data.isascii():
+                    continue
+                new_data = convert_text(meta_data)
+                if new_data == meta_data:
+                    # Unchanged text stays part of the surrounding copy run
+                    if text_end <= data_len:
+                        continue
+                elif verbose:
+                    # The decoder already succeeded in convert_text
+                    old_text = self._decode(meta_data, 'replace')[0]
+                    print(f"  [{_TEXT_META_NAMES[meta_type]}] {old_text[:40]}")
+                n = len(new_data)
+                # Same length: the original length bytes stay in the copy run
+                if n == text_end - text_start and text_end <= data_len:
+                    add_replacement((text_start, text_end, b'', new_data))
+                    continue
+                length_vlq = write_vlq(n)
+                text_end = min(text_end, data_len)
+                # The text is written straight from new_data by _write_tracks
+                add_replacement((length_pos, text_end, length_vlq, new_data))
+                track_size += len(length_vlq) + n - (text_end - length_pos)
+
+            tracks.append((pos, track_stop, track_size, replacements))
+            output_size += 8 + track_size
+
+        return header_end, tracks, output_size, False
+
+    def convert(self, input_file: str, output_file: Optional[str] = None,
+                auto_detect: bool = False, max_text_bytes: int = 65536) -> dict:
         """
         Convert a MIDI file's text encodings.
 
+        With auto_detect, the source encoding is detected from the text
+        events found by the same scan that drives the conversion, so the
+        file is only read once; from_encoding is kept if nothing is found.
+
         Args:
             input_file: Path to input MIDI file
-            output_file: Path to output MIDI file (default: input_converted.mid)
+            output_file: Path to output MIDI file (default: input_converted.mid
+                next to the input file)
+            auto_detect: Detect the source encoding before converting
+            max_text_bytes: Maximum number of text bytes used for detection
 
         Returns:
             Dictionary with conversion statistics
@@ -120,216 +654,184 @@ class MidiEncodingConverter:
         input_path = Path(input_file)
 
         if output_file is None:
-            output_file = input_path.stem + "_converted" + input_path.suffix
+            output_file = str(input_path.with_name(
+                input_path.stem + "_converted" + input_path.suffix))
+
+        result = {'input_file': str(input_file), 'output_file': str(output_file)}
+
+        # Truncating the input while it is mapped would pull the pages out
+        # from under us, so converting a file onto itself goes through memory
+        if os.path.exists(output_file) and os.path.samefile(input_file, output_file):
+            with open(input_file, 'rb') as f:
+                output, stats = self.convert_bytes(f.read(), auto_detect, max_text_bytes)
+            with open(output_file, 'wb') as f:
+                f.write(output)
+            result.update(stats)
+            return result
+
+        with _map_input(input_file) as data:
+            header_end, tracks, output_size, unchanged = self._plan(data, auto_detect, max_text_bytes)
+            if unchanged:
+                # Nothing to rewrite; let the OS copy the file
+                shutil.copyfile(input_file, output_file)
+            else:
+                # Pass 3: stream the tracks to disk straight from the mapping
+                with open(output_file, 'wb', buffering=_WRITE_BUFFER_SIZE) as f:
+                    _write_tracks(f.write, data, header_end, tracks)
+            input_size = len(data)
 
-        with open(input_file, 'rb') as f:
-            data = bytearray(f.read())
+        result.update(self._stats(len(tracks), input_size, output_size))
+        return result
 
-        # Validate MIDI header
-        if data[:4] != b'MThd':
-            raise ValueError("Not a valid MIDI file (missing MThd header)")
+    def convert_bytes(self, midi_data: bytes, auto_detect: bool = False,
+                      max_text_bytes: int = 65536) -> Tuple[bytes, dict]:
+        """
+        Convert the text encodings of a MIDI file held in memory.
 
-        self.converted_count = 0
-        self.error_count = 0
+        Args:
+            midi_data: Contents of a MIDI file
+            auto_detect: Detect the source encoding before converting
+            max_text_bytes: Maximum number of text bytes used for detection
 
-        pos = 0
-        output = bytearray()
+        Returns:
+            Tuple of (converted MIDI data, dictionary with conversion statistics)
+        """
+        # Text slices must come out as bytes to be usable as cache keys
+        midi_data = bytes(midi_data)
+        with memoryview(midi_data) as data:
+            header_end, tracks, output_size, unchanged = self._plan(data, auto_detect, max_text_bytes)
+            if unchanged:
+                output = midi_data
+            else:
+                buf = io.BytesIO()
+                _write_tracks(buf.write, data, header_end, tracks)
+                output = buf.getvalue()
 
-        # Copy MIDI header
-        header_length = struct.unpack('>I', data[4:8])[0]
-        output.extend(data[:8 + header_length])
-        pos = 8 + header_length
+        return output, self._stats(len(tracks), len(midi_data), output_size)
 
-        # Process each track
-        track_count = 0
-        while pos < len(data):
-            if data[pos:pos+4] != b'MTrk':
-                break
 
-            track_count += 1
-            track_start = len(output)
-            output.extend(data[pos:pos+4])  # MTrk
-            pos += 4
+# Meta event tables indexed by type byte, built from TEXT_META_TYPES:
+# a text flag for the scanners and the display name for verbose output
+_IS_TEXT_META = bytes(int(t in MidiEncodingConverter.TEXT_META_TYPES) for t in range(256))
+_TEXT_META_NAMES = [MidiEncodingConverter.TEXT_META_TYPES.get(t) for t in range(256)]
 
-            track_length = struct.unpack('>I', data[pos:pos+4])[0]
-            pos += 4
-            output.extend(b'\x00\x00\x00\x00')  # Placeholder for length
 
-            track_data_start = len(output)
-            track_end = pos + track_length
+def _convert_one(job: Tuple[str, Optional[str], str, str, bool]) -> dict:
+    """Convert a single file; module-level so worker processes can pickle it."""
+    input_file, output_file, from_encoding, to_encoding, verbose = job
+    converter = MidiEncodingConverter(from_encoding, to_encoding)
+    converter.verbose = verbose
+    try:
+        return converter.convert(input_file, output_file)
+    except (ValueError, OSError) as e:
+        # One bad file must not abort the rest of the batch
+        return {'input_file': input_file, 'output_file': output_file, 'error': str(e)}
 
-            running_status = 0
 
-            while pos < track_end:
-                # Read delta time
-                delta, new_pos = self.read_variable_length(data, pos)
-                output.extend(self.write_variable_length(delta))
-                pos = new_pos
-
-                # Read event
-                status = data[pos]
-
-                if status == 0xFF:  # Meta event
-                    output.append(data[pos])
-                    pos += 1
-                    meta_type = data[pos]
-                    output.append(data[pos])
-                    pos += 1
-                    length, new_pos = self.read_variable_length(data, pos)
-                    pos = new_pos
-
-                    meta_data = data[pos:pos + length]
-                    pos += length
-
-                    # Convert text meta events
-                    if meta_type in self.TEXT_META_TYPES:
-                        new_data = self.convert_text(bytes(meta_data))
-                        self.converted_count += 1
-                        if self.verbose and new_data != meta_data:
-                            try:
-                                old_text = meta_data.decode(self.from_encoding, errors='replace')
-                                new_text = new_data.decode(self.to_encoding, errors='replace')
-                                print(f"  [{self.TEXT_META_TYPES[meta_type]}] {old_text[:40]}")
-                            except:
-                                pass
-                    else:
-                        new_data = meta_data
-
-                    output.extend(self.write_variable_length(len(new_data)))
-                    output.extend(new_data)
-
-                elif status == 0xF0 or status == 0xF7:  # SysEx
-                    output.append(data[pos])
-                    pos += 1
-                    length, new_pos = self.read_variable_length(data, pos)
-                    output.extend(self.write_variable_length(length))
-                    pos = new_pos
-                    output.extend(data[pos:pos + length])
-                    pos += length
-                    running_status = 0
-
-                elif status & 0x80:  # Status byte
-                    running_status = status
-                    output.append(data[pos])
-                    pos += 1
-
-                    if status & 0xF0 in (0x80, 0x90, 0xA0, 0xB0, 0xE0):
-                        output.extend(data[pos:pos+2])
-                        pos += 2
-                    elif status & 0xF0 in (0xC0, 0xD0):
-                        output.append(data[pos])
-                        pos += 1
-
-                else:  # Running status
-                    if running_status:
-                        output.append(data[pos])
-                        pos += 1
-                        if running_status & 0xF0 in (0x80, 0x90, 0xA0, 0xB0, 0xE0):
-                            output.append(data[pos])
-                            pos += 1
-                    else:
-                        # Unknown byte, copy it
-                        output.append(data[pos])
-                        pos += 1
-
-            # Update track length
-            track_data_length = len(output) - track_data_start
-            struct.pack_into('>I', output, track_start + 4, track_data_length)
-
-        # Write output file
-        with open(output_file, 'wb') as f:
-            f.write(output)
+def convert_many(input_files: List[str], from_encoding: str = "shift_jis",
+                 to_encoding: str = "utf-8", output_dir: Optional[str] = None,
+                 workers: Optional[int] = None, verbose: bool = False) -> List[dict]:
+    """
+    Convert several MIDI files in parallel, one file per worker process.
 
-        return {
-            'input_file': str(input_file),
-            'output_file': str(output_file),
-            'tracks': track_count,
-            'converted': self.converted_count,
-            'errors': self.error_count,
-            'input_size': len(data),
-            'output_size': len(output),
-        }
+    Args:
+        input_files: Paths to input MIDI files
+        from_encoding: Source encoding (default: shift_jis)
+        to_encoding: Target encoding (default: utf-8)
+        output_dir: Directory for the "_converted" outputs (default: next
+            to each input file)
+        workers: Number of worker processes (default: CPU count)
+        verbose: Print each text event as it is converted
 
+    Returns:
+        List of conversion statistics, in the same order as input_files;
+        a file that could not be converted has an 'error' message instead
 
-def detect_encoding(input_file: str) -> List[Tuple[str, float]]:
+    Raises:
+        ValueError: If two inputs would share an output file, or an output
+            would overwrite one of the inputs
     """
-    Detect possible encodings in a MIDI file.
+    jobs = []
+    inputs = {Path(input_file).resolve() for input_file in input_files}
+    targets = {}
+    for input_file in input_files:
+        input_path = Path(input_file)
+        output_name = input_path.stem + "_converted" + input_path.suffix
+        if output_dir is None:
+            output_path = input_path.with_name(output_name)
+        else:
+            output_path = Path(output_dir) / output_name
 
-    Args:
-        input_file: Path to MIDI file
+        # Workers run concurrently, so a clash would silently lose a result
+        target = output_path.resolve()
+        if target in targets:
+            raise ValueError(f"{input_file} and {targets[target]} would both be "
+                             f"written to {output_path}")
+        if target in inputs:
+            raise ValueError(f"Output of {input_file} would overwrite input {output_path}")
+        targets[target] = input_file
+        jobs.append((str(input_file), str(output_path), from_encoding, to_encoding, verbose))
 
-    Returns:
-        List of (encoding, confidence) tuples
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+
+    # A pool is not worth starting for a single file
+    if workers <= 1:
+        return [_convert_one(job) for job in jobs]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_convert_one, jobs))
+
+
+def _text_payloads(data) -> Iterator[bytes]:
     """
-    try:
-        import chardet
-    except ImportError:
-        print("Warning: chardet not installed. Install with: pip install chardet", file=sys.stderr)
-        return []
+    Yield the payload of every text meta event, in file order.
 
-    with open(input_file, 'rb') as f:
-        data = f.read()
+    Tracks are walked by _scan_track, the same scanner convert() uses,
+    one track at a time so detection can stop early.
 
-    if data[:4] != b'MThd':
-        raise ValueError("Not a valid MIDI file")
+    Args:
+        data: MIDI file data as returned by _map_input
 
-    # Collect all text data
-    all_text_bytes = bytearray()
-    pos = 8 + struct.unpack('>I', data[4:8])[0]
+    Yields:
+        Raw text bytes of each non-empty text event
+    """
+    raw = data.obj
+    data_len = len(data)
+    pos = 8 + _U32_BE.unpack_from(data, 4)[0]
 
-    while pos < len(data):
+    while pos + 8 <= data_len:
         if data[pos:pos+4] != b'MTrk':
             break
-        pos += 4
-        track_length = struct.unpack('>I', data[pos:pos+4])[0]
-        pos += 4
-        track_end = pos + track_length
-
-        while pos < track_end:
-            # Skip delta time
-            while data[pos] & 0x80:
-                pos += 1
-            pos += 1
+        track_length = _U32_BE.unpack_from(data, pos + 4)[0]
+        pos += 8
+        spans = []
+        try:
+            _, pos = _scan_track(data, pos, min(pos + track_length, data_len), spans)
+        except IndexError:
+            # Truncated file: keep the text found before the cut
+            pos = data_len
+        for _, _, text_start, text_end in spans:
+            if text_end > text_start:
+                yield raw[text_start:text_end]
 
-            status = data[pos]
 
-            if status == 0xFF:
-                pos += 1
-                meta_type = data[pos]
-                pos += 1
-                length = 0
-                while data[pos] & 0x80:
-                    length = (length << 7) | (data[pos] & 0x7F)
-                    pos += 1
-                length = (length << 7) | data[pos]
-                pos += 1
+def detect_encoding(input_file: str,
+                    max_text_bytes: int = 65536) -> List[Tuple[str, float]]:
+    """
+    Detect possible encodings in a MIDI file.
 
-                if meta_type in (0x01, 0x02, 0x03, 0x04, 0x05, 0x06, 0x07):
-                    all_text_bytes.extend(data[pos:pos + length])
-                pos += length
-            elif status == 0xF0 or status == 0xF7:
-                pos += 1
-                length = 0
-                while data[pos] & 0x80:
-                    length = (length << 7) | (data[pos] & 0x7F)
-                    pos += 1
-                length = (length << 7) | data[pos]
-                pos += 1
-                pos += length
-            elif status & 0x80:
-                pos += 1
-                if status & 0xF0 in (0x80, 0x90, 0xA0, 0xB0, 0xE0):
-                    pos += 2
-                elif status & 0xF0 in (0xC0, 0xD0):
-                    pos += 1
-            else:
-                pos += 1
+    Args:
+        input_file: Path to MIDI file
+        max_text_bytes: Maximum number of text bytes to examine
 
-    if all_text_bytes:
-        results = chardet.detect_all(bytes(all_text_bytes))
-        return [(r['encoding'], r['confidence']) for r in results if r['encoding']]
+    Returns:
+        List of (encoding, confidence) tuples
+    """
+    with _map_input(input_file) as data:
+        if data[:4] != b'MThd':
+            raise ValueError("Not a valid MIDI file")
 
-    return []
+        return _detect_text(_text_payloads(data), max_text_bytes)
 
 
 def main():
@@ -343,11 +845,12 @@ Examples:
   %(prog)s input.mid -o output.mid             # Specify output file
   %(prog)s input.mid -f gbk -t utf-8           # Convert from GBK to UTF-8
   %(prog)s input.mid --detect                  # Detect encoding only
+  %(prog)s a.mid b.mid c.mid -j 4              # Convert several files in parallel
         """
     )
 
-    parser.add_argument('input', help='Input MIDI file')
-    parser.add_argument('-o', '--output', help='Output MIDI file')
+    parser.add_argument('input', nargs='+', help='Input MIDI file(s)')
+    parser.add_argument('-o', '--output', help='Output MIDI file (single input only)')
     parser.add_argument('-f', '--from-encoding', default='shift_jis',
                         help='Source encoding (default: shift_jis)')
     parser.add_argument('-t', '--to-encoding', default='utf-8',
@@ -356,28 +859,61 @@ Examples:
                         help='Detect encoding only (do not convert)')
     parser.add_argument('-v', '--verbose', action='store_true',
                         help='Verbose output')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='Worker processes for multiple inputs (default: CPU count)')
     parser.add_argument('--version', action='version', version=f'%(prog)s {__version__}')
 
     args = parser.parse_args()
 
+    if args.output and len(args.input) > 1:
+        parser.error("-o/--output can only be used with a single input file")
+
     if args.detect:
-        print(f"Detecting encoding in: {args.input}")
-        results = detect_encoding(args.input)
-        if results:
-            print("\nPossible encodings:")
-            for encoding, confidence in results:
-                print(f"  {encoding}: {confidence:.1%}")
-        else:
-            print("No encoding detected or file contains only ASCII text.")
+        for input_file in args.input:
+            print(f"Detecting encoding in: {input_file}")
+            results = detect_encoding(input_file)
+            if results:
+                print("\nPossible encodings:")
+                for encoding, confidence in results:
+                    print(f"  {encoding}: {confidence:.1%}")
+            else:
+                print("No encoding detected or file contains only ASCII text.")
+        return
+
+    if len(args.input) > 1:
+        print(f"Converting {len(args.input)} files")
+        print(f"Encoding: {args.from_encoding} -> {args.to_encoding}")
+        try:
+            results = convert_many(args.input, args.from_encoding, args.to_encoding,
+                                   workers=args.jobs, verbose=args.verbose)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+
+        failed = 0
+        for result in results:
+            if 'error' in result:
+                failed += 1
+                print(f"  Error: {result['input_file']}: {result['error']}", file=sys.stderr)
+            else:
+                print(f"  {result['input_file']} -> {result['output_file']} "
+                      f"({result['converted']} converted, {result['errors']} errors)")
+        if failed:
+            sys.exit(1)
         return
 
+    input_file = args.input[0]
     converter = MidiEncodingConverter(args.from_encoding, args.to_encoding)
     converter.verbose = args.verbose
 
-    print(f"Converting: {args.input}")
+    print(f"Converting: {input_file}")
     print(f"Encoding: {args.from_encoding} -> {args.to_encoding}")
 
-    result = converter.convert(args.input, args.output)
+    try:
+        result = converter.convert(input_file, args.output)
+    except (ValueError, OSError) as e:
+        print(f"Error: {input_file}: {e}", file=sys.stderr)
+        sys.exit(1)
 
     print(f"\nConversion complete!")
     print(f"  Output: {result['output_file']}")
@@ -389,4 +925,5 @@ Examples:
 
 
 if __name__ == '__main__':
+    freeze_support()
     main()
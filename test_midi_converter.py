@@ -5,29 +5,80 @@ Unit tests for MIDI Encoding Converter
 
 This module contains comprehensive tests for the MIDI encoding converter,
 including tests for different encodings, edge cases, and the GUI components.
+
+Run directly (python test_midi_converter.py; set MIDI_TEST_VERBOSE=1 to
+list every test) or with pytest. Fixtures and temporary directories belong
+to each test class, so the classes can also be spread over workers with
+pytest-xdist (pytest -n auto --dist loadscope).
 """
 
+import codecs
+import io
 import os
+import shutil
 import sys
 import struct
 import tempfile
 import unittest
 from pathlib import Path
+from unittest import mock
+
+try:
+    import chardet
+except ImportError:
+    chardet = None
 
-# Add parent directory to path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import midi_encoding_converter
+from midi_encoding_converter import (MidiEncodingConverter, _text_payloads, convert_many,
+                                     detect_encoding)
 
-from midi_encoding_converter import MidiEncodingConverter, detect_encoding
+# Whether detect_encoding has a backend (cchardet, charset_normalizer or chardet)
+_HAVE_DETECTOR = midi_encoding_converter._DETECTOR is not None
 
 
 def write_variable_length(value: int) -> bytes:
-    """Write a variable-length quantity."""
-    result = [value & 0x7F]
-    value >>= 7
-    while value:
-        result.append((value & 0x7F) | 0x80)
-        value >>= 7
-    return bytes(reversed(result))
+    """Write a variable-length quantity (1-4 bytes, as MIDI allows)."""
+    if value < 0x80:
+        return bytes((value,))
+    if value < 0x4000:
+        return bytes((0x80 | (value >> 7), value & 0x7F))
+    if value < 0x200000:
+        return bytes((0x80 | (value >> 14), 0x80 | ((value >> 7) & 0x7F), value & 0x7F))
+    return bytes((0x80 | (value >> 21), 0x80 | ((value >> 14) & 0x7F),
+                  0x80 | ((value >> 7) & 0x7F), value & 0x7F))
+
+
+# Keep test file I/O in RAM where a writable tmpfs is available
+_TEMP_ROOT = '/dev/shm' if os.access('/dev/shm', os.W_OK) else None
+
+# Delta times used by every test track
+_VLQ_0 = write_variable_length(0)
+_VLQ_480 = write_variable_length(480)
+
+# MIDI header: length 6, format 0, 1 track, 480 ticks per quarter note
+_HEADER = b'MThd\x00\x00\x00\x06\x00\x00\x00\x01\x01\xe0'
+
+# Delta time and meta header for each text event type (0x01-0x07)
+_TEXT_META_PREFIX = {t: _VLQ_0 + bytes((0xFF, t)) for t in range(0x01, 0x08)}
+
+# Note on/off for C4 followed by the end-of-track event
+_NOTE_AND_END = (_VLQ_0 + bytes((0x90, 60, 100)) + _VLQ_480 + bytes((0x80, 60, 0))
+                 + _VLQ_0 + bytes((0xFF, 0x2F, 0x00)))
+
+
+# Converters shared across tests, keyed by (from_encoding, to_encoding).
+# Each conversion resets the counts, so reuse is safe for tests that only
+# convert; tests that change converter attributes build their own.
+_CONVERTERS = {}
+
+
+def get_converter(from_encoding: str = 'shift_jis', to_encoding: str = 'utf-8') -> MidiEncodingConverter:
+    """Return a shared converter for the given encoding pair."""
+    key = (from_encoding, to_encoding)
+    converter = _CONVERTERS.get(key)
+    if converter is None:
+        converter = _CONVERTERS[key] = MidiEncodingConverter(from_encoding, to_encoding)
+    return converter
 
 
 def create_test_midi(texts: list, encoding: str = 'utf-8') -> bytes:
@@ -41,41 +92,42 @@ def create_test_midi(texts: list, encoding: str = 'utf-8') -> bytes:
     Returns:
         MIDI file as bytes
     """
-    # MIDI header
-    header = b'MThd'
-    header += struct.pack('>I', 6)  # Header length
-    header += struct.pack('>H', 0)  # Format 0
-    header += struct.pack('>H', 1)  # 1 track
-    header += struct.pack('>H', 480)  # Ticks per quarter note
-
     # Build track data
-    track_data = bytearray()
+    parts = []
+    encode = codecs.getencoder(encoding)
 
     # Add text events
     for meta_type, text in texts:
-        track_data.extend(write_variable_length(0))
-        track_data.append(0xFF)
-        track_data.append(meta_type)
-        text_bytes = text.encode(encoding)
-        track_data.extend(write_variable_length(len(text_bytes)))
-        track_data.extend(text_bytes)
+        text_bytes = encode(text)[0] if text else b''
+        parts.append(_TEXT_META_PREFIX.get(meta_type) or _VLQ_0 + bytes((0xFF, meta_type)))
+        parts.append(write_variable_length(len(text_bytes)))
+        parts.append(text_bytes)
 
-    # Add a simple note
-    track_data.extend(write_variable_length(0))
-    track_data.extend(bytes([0x90, 60, 100]))  # Note on
-    track_data.extend(write_variable_length(480))
-    track_data.extend(bytes([0x80, 60, 0]))  # Note off
+    # Add a simple note, then end of track
+    parts.append(_NOTE_AND_END)
 
-    # End of track
-    track_data.extend(write_variable_length(0))
-    track_data.extend(bytes([0xFF, 0x2F, 0x00]))
+    track_data = b''.join(parts)
 
-    # Track header
-    track = b'MTrk'
-    track += struct.pack('>I', len(track_data))
-    track += bytes(track_data)
+    # Header, then the single track chunk
+    return _HEADER + b'MTrk' + struct.pack('>I', len(track_data)) + track_data
 
-    return header + track
+
+# Fixed fixtures built once at import: a very long track name and
+# non-Latin symbols
+_LONG_MIDI = create_test_midi([(0x03, "あ" * 5000)], 'shift_jis')
+_SPECIAL_MIDI = create_test_midi([
+    (0x03, "Test™ © ® € £ ¥"),
+    (0x05, "♪ ♫ ♬ ♩"),
+], 'utf-8')
+
+
+# Known text as raw bytes: "日本語", "中文测试" and "한국어"
+_JP_SHIFT_JIS = b'\x93\xfa\x96{\x8c\xea'
+_JP_UTF8 = b'\xe6\x97\xa5\xe6\x9c\xac\xe8\xaa\x9e'
+_ZH_GBK = b'\xd6\xd0\xce\xc4\xb2\xe2\xca\xd4'
+_ZH_UTF8 = b'\xe4\xb8\xad\xe6\x96\x87\xe6\xb5\x8b\xe8\xaf\x95'
+_KO_EUC_KR = b'\xc7\xd1\xb1\xb9\xbe\xee'
+_KO_UTF8 = b'\xed\x95\x9c\xea\xb5\xad\xec\x96\xb4'
 
 
 class TestVariableLengthEncoding(unittest.TestCase):
@@ -83,7 +135,7 @@ class TestVariableLengthEncoding(unittest.TestCase):
 
     def test_read_single_byte(self):
         """Test reading single-byte variable length values."""
-        converter = MidiEncodingConverter()
+        converter = get_converter()
 
         # Test values 0-127 (single byte)
         for value in [0, 1, 64, 127]:
@@ -94,7 +146,7 @@ class TestVariableLengthEncoding(unittest.TestCase):
 
     def test_read_multi_byte(self):
         """Test reading multi-byte variable length values."""
-        converter = MidiEncodingConverter()
+        converter = get_converter()
 
         # 128 = 0x81 0x00
         data = bytes([0x81, 0x00])
@@ -107,9 +159,21 @@ class TestVariableLengthEncoding(unittest.TestCase):
         result, pos = converter.read_variable_length(data, 0)
         self.assertEqual(result, 255)
 
+    def test_read_too_long(self):
+        """Test that quantities longer than 4 bytes are rejected."""
+        converter = get_converter()
+
+        # 0x0FFFFFFF is the largest 4-byte value
+        result, pos = converter.read_variable_length(bytes([0xFF, 0xFF, 0xFF, 0x7F]), 0)
+        self.assertEqual(result, 0x0FFFFFFF)
+        self.assertEqual(pos, 4)
+
+        with self.assertRaises(ValueError):
+            converter.read_variable_length(bytes([0x81, 0x80, 0x80, 0x80, 0x00]), 0)
+
     def test_write_single_byte(self):
         """Test writing single-byte variable length values."""
-        converter = MidiEncodingConverter()
+        converter = get_converter()
 
         for value in [0, 1, 64, 127]:
             result = converter.write_variable_length(value)
@@ -117,7 +181,7 @@ class TestVariableLengthEncoding(unittest.TestCase):
 
     def test_write_multi_byte(self):
         """Test writing multi-byte variable length values."""
-        converter = MidiEncodingConverter()
+        converter = get_converter()
 
         # 128 should be 0x81 0x00
         result = converter.write_variable_length(128)
@@ -129,47 +193,64 @@ class TestVariableLengthEncoding(unittest.TestCase):
 
     def test_roundtrip(self):
         """Test that write and read are inverses."""
-        converter = MidiEncodingConverter()
+        converter = get_converter()
 
-        for value in [0, 1, 127, 128, 255, 256, 1000, 10000, 100000]:
+        for value in [0, 1, 127, 128, 255, 256, 1000, 10000, 100000,
+                      0x1FFFFF, 0x200000, 0x0FFFFFFF]:
             written = converter.write_variable_length(value)
             read, _ = converter.read_variable_length(written, 0)
             self.assertEqual(read, value, f"Roundtrip failed for {value}")
 
+    def test_roundtrip_stream(self):
+        """Test decoding many quantities written back to back."""
+        converter = get_converter()
+
+        # A stride through the whole 4-byte range plus each length boundary
+        values = list(range(0, 0x10000000, 0x1FFF))
+        values += [0x7F, 0x80, 0x3FFF, 0x4000, 0x1FFFFF, 0x200000, 0x0FFFFFFF]
+        data = b''.join(map(converter.write_variable_length, values))
+
+        decoded = []
+        pos = 0
+        while pos < len(data):
+            value, pos = converter.read_variable_length(data, pos)
+            decoded.append(value)
+        self.assertEqual(decoded, values)
+
 
 class TestTextConversion(unittest.TestCase):
     """Tests for text encoding conversion."""
 
     def test_shift_jis_to_utf8(self):
         """Test converting Shift_JIS to UTF-8."""
-        converter = MidiEncodingConverter('shift_jis', 'utf-8')
+        converter = get_converter('shift_jis', 'utf-8')
 
         # Japanese text in Shift_JIS
-        original = "日本語".encode('shift_jis')
+        original = _JP_SHIFT_JIS
         converted = converter.convert_text(original)
-        self.assertEqual(converted.decode('utf-8'), "日本語")
+        self.assertEqual(converted, _JP_UTF8)
 
     def test_gbk_to_utf8(self):
         """Test converting GBK to UTF-8."""
-        converter = MidiEncodingConverter('gbk', 'utf-8')
+        converter = get_converter('gbk', 'utf-8')
 
         # Chinese text in GBK
-        original = "中文测试".encode('gbk')
+        original = _ZH_GBK
         converted = converter.convert_text(original)
-        self.assertEqual(converted.decode('utf-8'), "中文测试")
+        self.assertEqual(converted, _ZH_UTF8)
 
     def test_euc_kr_to_utf8(self):
         """Test converting EUC-KR to UTF-8."""
-        converter = MidiEncodingConverter('euc-kr', 'utf-8')
+        converter = get_converter('euc-kr', 'utf-8')
 
         # Korean text in EUC-KR
-        original = "한국어".encode('euc-kr')
+        original = _KO_EUC_KR
         converted = converter.convert_text(original)
-        self.assertEqual(converted.decode('utf-8'), "한국어")
+        self.assertEqual(converted, _KO_UTF8)
 
     def test_utf8_passthrough(self):
         """Test that UTF-8 to UTF-8 is passthrough."""
-        converter = MidiEncodingConverter('utf-8', 'utf-8')
+        converter = get_converter('utf-8', 'utf-8')
 
         original = "Hello 世界!".encode('utf-8')
         converted = converter.convert_text(original)
@@ -177,69 +258,102 @@ class TestTextConversion(unittest.TestCase):
 
     def test_ascii_compatibility(self):
         """Test that ASCII text works with any encoding."""
-        converter = MidiEncodingConverter('shift_jis', 'utf-8')
+        converter = get_converter('shift_jis', 'utf-8')
 
         original = b"Hello World"
         converted = converter.convert_text(original)
         self.assertEqual(converted.decode('utf-8'), "Hello World")
 
+    def test_repeated_text(self):
+        """Test that repeated payloads convert the same and errors still count."""
+        converter = get_converter('shift_jis', 'utf-8')
+
+        original = "さくら".encode('shift_jis')
+        first = converter.convert_text(original)
+        self.assertEqual(converter.convert_text(original), first)
+
+        converter = MidiEncodingConverter('shift_jis', 'ascii')
+        converter.convert_text(original)
+        converter.convert_text(original)
+        self.assertEqual(converter.error_count, 2)
+
+    def test_bytes_like_input(self):
+        """Test that bytearray and memoryview payloads are accepted."""
+        converter = get_converter('shift_jis', 'utf-8')
+
+        for original in (bytearray(_JP_SHIFT_JIS), memoryview(_JP_SHIFT_JIS),
+                         bytearray(b"Piano"), memoryview(b"Piano")):
+            self.assertEqual(converter.convert_text(original),
+                             bytes(original).decode('shift_jis').encode('utf-8'))
+
+    def test_passthrough_shortcuts(self):
+        """Test that same-encoding and ASCII payloads are returned unchanged."""
+        converter = get_converter('utf-8', 'UTF8')
+        original = "さくら".encode('shift_jis')  # Not valid UTF-8
+        self.assertEqual(converter.convert_text(original), original)
+
+        converter = get_converter('shift_jis', 'utf-8')
+        self.assertEqual(converter.convert_text(b"Piano"), b"Piano")
+
+        # UTF-16 is not ASCII-compatible, so ASCII still gets converted
+        converter = get_converter('ascii', 'utf-16-le')
+        self.assertEqual(converter.convert_text(b"Hi"), "Hi".encode('utf-16-le'))
+
 
 class TestMidiConversion(unittest.TestCase):
     """Tests for complete MIDI file conversion."""
 
-    def setUp(self):
-        """Create temporary directory for test files."""
-        self.temp_dir = tempfile.mkdtemp()
-
-    def tearDown(self):
+    @classmethod
+    def setUpClass(cls):
+        """Build the test MIDI files and a temporary directory once."""
+        cls.fixtures = {
+            'japanese': create_test_midi([(0x03, "テスト"), (0x05, "さくら")], 'shift_jis'),
+            'japanese_title': create_test_midi([(0x03, "テスト")], 'shift_jis'),
+            'chinese': create_test_midi([(0x03, "测试"), (0x01, "中文歌曲")], 'gbk'),
+            'simple': create_test_midi([(0x03, "Test")], 'utf-8'),
+            'track_name': create_test_midi([(0x03, "Track Name")], 'utf-8'),
+            'all_types': create_test_midi([
+                (0x01, "テキスト"),
+                (0x02, "著作権"),
+                (0x03, "トラック名"),
+                (0x04, "楽器"),
+                (0x05, "歌詞"),
+                (0x06, "マーカー"),
+                (0x07, "キュー"),
+            ], 'shift_jis'),
+            'ascii': create_test_midi([(0x03, "Piano"), (0x01, "Verse 1")], 'ascii'),
+        }
+        # One directory for the whole class; every test uses its own file names
+        cls.temp_dir = tempfile.mkdtemp(dir=_TEMP_ROOT)
+
+    @classmethod
+    def tearDownClass(cls):
         """Clean up temporary files."""
-        import shutil
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
+        shutil.rmtree(cls.temp_dir, ignore_errors=True)
 
     def test_convert_japanese_midi(self):
         """Test converting a Japanese MIDI file."""
-        # Create test file
-        texts = [
-            (0x03, "テスト"),
-            (0x05, "さくら"),
-        ]
-        midi_data = create_test_midi(texts, 'shift_jis')
-
-        input_path = os.path.join(self.temp_dir, 'japanese.mid')
-        output_path = os.path.join(self.temp_dir, 'japanese_utf8.mid')
-
-        with open(input_path, 'wb') as f:
-            f.write(midi_data)
+        converter = get_converter('shift_jis', 'utf-8')
+        data, result = converter.convert_bytes(self.fixtures['japanese'])
 
-        # Convert
-        converter = MidiEncodingConverter('shift_jis', 'utf-8')
-        result = converter.convert(input_path, output_path)
-
-        # Verify
         self.assertEqual(result['converted'], 2)
         self.assertEqual(result['errors'], 0)
-        self.assertTrue(os.path.exists(output_path))
+        self.assertEqual(result['output_size'], len(data))
 
-        # Verify output is valid MIDI
-        with open(output_path, 'rb') as f:
-            data = f.read()
-            self.assertEqual(data[:4], b'MThd')
+        # Verify output is valid MIDI with the converted text
+        self.assertEqual(data[:4], b'MThd')
+        self.assertIn("さくら".encode('utf-8'), data)
 
     def test_convert_chinese_midi(self):
-        """Test converting a Chinese MIDI file."""
-        texts = [
-            (0x03, "测试"),
-            (0x01, "中文歌曲"),
-        ]
-        midi_data = create_test_midi(texts, 'gbk')
+        """Test converting a Chinese MIDI file on disk."""
+        midi_data = self.fixtures['chinese']
 
         input_path = os.path.join(self.temp_dir, 'chinese.mid')
         output_path = os.path.join(self.temp_dir, 'chinese_utf8.mid')
 
-        with open(input_path, 'wb') as f:
-            f.write(midi_data)
+        Path(input_path).write_bytes(midi_data)
 
-        converter = MidiEncodingConverter('gbk', 'utf-8')
+        converter = get_converter('gbk', 'utf-8')
         result = converter.convert(input_path, output_path)
 
         self.assertEqual(result['converted'], 2)
@@ -247,122 +361,291 @@ class TestMidiConversion(unittest.TestCase):
 
     def test_track_count(self):
         """Test that track count is correctly reported."""
-        texts = [(0x03, "Track Name")]
-        midi_data = create_test_midi(texts, 'utf-8')
-
-        input_path = os.path.join(self.temp_dir, 'single_track.mid')
-        output_path = os.path.join(self.temp_dir, 'output.mid')
-
-        with open(input_path, 'wb') as f:
-            f.write(midi_data)
-
-        converter = MidiEncodingConverter('utf-8', 'utf-8')
-        result = converter.convert(input_path, output_path)
+        converter = get_converter('utf-8', 'utf-8')
+        _, result = converter.convert_bytes(self.fixtures['track_name'])
 
         self.assertEqual(result['tracks'], 1)
 
     def test_all_text_meta_types(self):
         """Test that all text meta event types are converted."""
-        texts = [
-            (0x01, "Text Event"),
-            (0x02, "Copyright"),
-            (0x03, "Track Name"),
-            (0x04, "Instrument"),
-            (0x05, "Lyric"),
-            (0x06, "Marker"),
-            (0x07, "Cue Point"),
-        ]
-        midi_data = create_test_midi(texts, 'utf-8')
-
-        input_path = os.path.join(self.temp_dir, 'all_types.mid')
-        output_path = os.path.join(self.temp_dir, 'output.mid')
-
-        with open(input_path, 'wb') as f:
-            f.write(midi_data)
-
-        converter = MidiEncodingConverter('utf-8', 'utf-8')
-        result = converter.convert(input_path, output_path)
+        converter = get_converter('shift_jis', 'utf-8')
+        data, result = converter.convert_bytes(self.fixtures['all_types'])
 
         self.assertEqual(result['converted'], 7)
+        self.assertEqual(data, (
+            b'MThd\x00\x00\x00\x06\x00\x00\x00\x01\x01\xe0'
+            b'MTrk\x00\x00\x00\x6e'  # Track grows from 87 to 110 bytes
+            b'\x00\xff\x01\x0c\xe3\x83\x86\xe3\x82\xad\xe3\x82\xb9\xe3\x83\x88'  # テキスト
+            b'\x00\xff\x02\x09\xe8\x91\x97\xe4\xbd\x9c\xe6\xa8\xa9'  # 著作権
+            b'\x00\xff\x03\x0f\xe3\x83\x88\xe3\x83\xa9\xe3\x83\x83\xe3\x82\xaf\xe5\x90\x8d'  # トラック名
+            b'\x00\xff\x04\x06\xe6\xa5\xbd\xe5\x99\xa8'  # 楽器
+            b'\x00\xff\x05\x06\xe6\xad\x8c\xe8\xa9\x9e'  # 歌詞
+            b'\x00\xff\x06\x0c\xe3\x83\x9e\xe3\x83\xbc\xe3\x82\xab\xe3\x83\xbc'  # マーカー
+            b'\x00\xff\x07\x09\xe3\x82\xad\xe3\x83\xa5\xe3\x83\xbc'  # キュー
+            b'\x00\x90\x3c\x64\x83\x60\x80\x3c\x00'  # Note on/off
+            b'\x00\xff\x2f\x00'  # End of track
+        ))
+
+    def test_length_vlq_grows(self):
+        """Test a payload whose length VLQ grows from 1 to 2 bytes."""
+        text = "中文" * 25  # 100 bytes of GBK, 150 bytes of UTF-8
+        midi_data = create_test_midi([(0x03, text)], 'gbk')
+        expected = create_test_midi([(0x03, text)], 'utf-8')
+        converter = get_converter('gbk', 'utf-8')
+
+        data, result = converter.convert_bytes(midi_data)
+        self.assertEqual(result['output_size'], len(midi_data) + 51)
+        self.assertEqual(struct.unpack_from('>I', data, 18)[0],
+                         struct.unpack_from('>I', midi_data, 18)[0] + 51)
+        self.assertEqual(data[22:26], b'\x00\xff\x03\x81')
+        self.assertEqual(data, expected)
+
+        # Same result when written to disk
+        input_path = os.path.join(self.temp_dir, 'grow.mid')
+        output_path = os.path.join(self.temp_dir, 'grow_utf8.mid')
+        Path(input_path).write_bytes(midi_data)
+        converter.convert(input_path, output_path)
+        self.assertEqual(Path(output_path).read_bytes(), expected)
 
-    def test_invalid_midi_file(self):
-        """Test handling of invalid MIDI file."""
-        input_path = os.path.join(self.temp_dir, 'invalid.mid')
-        output_path = os.path.join(self.temp_dir, 'output.mid')
+    def test_convert_iso_2022_jp(self):
+        """Test that 7-bit ISO-2022-JP text is converted, not passed through."""
+        midi_data = create_test_midi([(0x03, "さくら")], 'iso-2022-jp')
+        converter = get_converter('iso-2022-jp', 'utf-8')
+        data, result = converter.convert_bytes(midi_data)
 
-        with open(input_path, 'wb') as f:
-            f.write(b'This is not a MIDI file')
+        self.assertEqual(result['converted'], 1)
+        self.assertIn("さくら".encode('utf-8'), data)
+        self.assertNotIn(b'\x1b$B', data)
 
-        converter = MidiEncodingConverter('utf-8', 'utf-8')
+    def test_invalid_midi_file(self):
+        """Test handling of invalid MIDI file."""
+        converter = get_converter('utf-8', 'utf-8')
 
         with self.assertRaises(ValueError) as context:
-            converter.convert(input_path, output_path)
+            converter.convert_bytes(b'This is not a MIDI file')
 
         self.assertIn('MThd', str(context.exception))
 
     def test_default_output_filename(self):
         """Test that default output filename is generated correctly."""
-        texts = [(0x03, "Test")]
-        midi_data = create_test_midi(texts, 'utf-8')
+        midi_data = self.fixtures['simple']
 
         input_path = os.path.join(self.temp_dir, 'input.mid')
-        with open(input_path, 'wb') as f:
-            f.write(midi_data)
+        Path(input_path).write_bytes(midi_data)
 
-        converter = MidiEncodingConverter('utf-8', 'utf-8')
+        converter = get_converter('utf-8', 'utf-8')
         result = converter.convert(input_path)  # No output path specified
 
-        self.assertIn('_converted', result['output_file'])
+        # Written next to the input, like convert_many
+        output_path = os.path.join(self.temp_dir, 'input_converted.mid')
+        self.assertEqual(result['output_file'], output_path)
+        self.assertTrue(os.path.exists(output_path))
+
+    def test_convert_many(self):
+        """Test converting several files in worker processes."""
+        input_paths = []
+        for name, text in (('a.mid', "テスト"), ('b.mid', "さくら")):
+            path = os.path.join(self.temp_dir, name)
+            Path(path).write_bytes(create_test_midi([(0x03, text)], 'shift_jis'))
+            input_paths.append(path)
+
+        results = convert_many(input_paths, 'shift_jis', 'utf-8',
+                               output_dir=self.temp_dir, workers=2)
+
+        self.assertEqual([r['input_file'] for r in results], input_paths)
+        for result in results:
+            self.assertEqual(result['converted'], 1)
+            self.assertTrue(os.path.exists(result['output_file']))
+
+    def test_convert_many_next_to_inputs(self):
+        """Test that batch outputs default to each input's directory."""
+        input_paths = []
+        for name in ('left', 'right'):
+            directory = os.path.join(self.temp_dir, name)
+            os.mkdir(directory)
+            path = os.path.join(directory, 'song.mid')
+            Path(path).write_bytes(self.fixtures['japanese_title'])
+            input_paths.append(path)
+
+        results = convert_many(input_paths, 'shift_jis', 'utf-8', workers=1)
+
+        self.assertEqual([r['output_file'] for r in results],
+                         [os.path.join(os.path.dirname(p), 'song_converted.mid')
+                          for p in input_paths])
+
+    def test_convert_many_rejects_shared_output(self):
+        """Test that two inputs mapping to one output file are refused."""
+        input_paths = []
+        for name in ('one', 'two'):
+            directory = os.path.join(self.temp_dir, name)
+            os.mkdir(directory)
+            path = os.path.join(directory, 'clash.mid')
+            Path(path).write_bytes(self.fixtures['japanese_title'])
+            input_paths.append(path)
+
+        with self.assertRaises(ValueError):
+            convert_many(input_paths, 'shift_jis', 'utf-8', output_dir=self.temp_dir)
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, 'clash_converted.mid')))
+
+    def test_convert_many_reports_failed_file(self):
+        """Test that a bad file is reported without aborting the batch."""
+        good_path = os.path.join(self.temp_dir, 'good.mid')
+        bad_path = os.path.join(self.temp_dir, 'bad.mid')
+        Path(good_path).write_bytes(self.fixtures['japanese_title'])
+        Path(bad_path).write_bytes(b'not a midi file')
+
+        results = convert_many([good_path, bad_path], 'shift_jis', 'utf-8', workers=2)
+
+        self.assertEqual(results[0]['converted'], 1)
+        self.assertIn('MThd', results[1]['error'])
+
+    def test_main_batch_exit_status(self):
+        """Test that the command line exits non-zero when a batch file fails."""
+        good_path = os.path.join(self.temp_dir, 'cli_good.mid')
+        Path(good_path).write_bytes(self.fixtures['japanese_title'])
+        missing_path = os.path.join(self.temp_dir, 'missing.mid')
+
+        argv = ['midi_encoding_converter.py', good_path, missing_path, '-j', '1']
+        stderr = io.StringIO()
+        with mock.patch.object(sys, 'argv', argv), mock.patch('sys.stdout', io.StringIO()), \
+                mock.patch('sys.stderr', stderr), self.assertRaises(SystemExit) as cm:
+            midi_encoding_converter.main()
+
+        self.assertEqual(cm.exception.code, 1)
+        self.assertIn('missing.mid', stderr.getvalue())
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, 'cli_good_converted.mid')))
+
+    def test_convert_in_place(self):
+        """Test converting a file onto itself."""
+        input_path = os.path.join(self.temp_dir, 'in_place.mid')
+        Path(input_path).write_bytes(self.fixtures['japanese_title'])
+
+        converter = get_converter('shift_jis', 'utf-8')
+        converter.convert(input_path, input_path)
+
+        self.assertIn("テスト".encode('utf-8'), Path(input_path).read_bytes())
+
+    def test_same_encoding_copies_file(self):
+        """Test that converting to the source encoding copies the file."""
+        midi_data = self.fixtures['japanese']
+        input_path = os.path.join(self.temp_dir, 'same.mid')
+        output_path = os.path.join(self.temp_dir, 'same_out.mid')
+        Path(input_path).write_bytes(midi_data)
+
+        converter = get_converter('shift_jis', 'SJIS')
+        result = converter.convert(input_path, output_path)
+
+        self.assertEqual(result['converted'], 2)
+        self.assertEqual(result['tracks'], 1)
+        self.assertEqual(Path(output_path).read_bytes(), midi_data)
+
+    def test_ascii_file_unchanged(self):
+        """Test that a file with only ASCII text is copied byte for byte."""
+        midi_data = self.fixtures['ascii']
+        input_path = os.path.join(self.temp_dir, 'ascii.mid')
+        output_path = os.path.join(self.temp_dir, 'ascii_out.mid')
+        Path(input_path).write_bytes(midi_data)
+
+        converter = get_converter('shift_jis', 'utf-8')
+        result = converter.convert(input_path, output_path)
+
+        self.assertEqual(result['converted'], 2)
+        self.assertEqual(Path(output_path).read_bytes(), midi_data)
 
 
 class TestEncodingDetection(unittest.TestCase):
     """Tests for encoding detection functionality."""
 
-    def setUp(self):
-        """Create temporary directory for test files."""
-        self.temp_dir = tempfile.mkdtemp()
-
-    def tearDown(self):
+    @classmethod
+    def setUpClass(cls):
+        """Build the test MIDI files and a temporary directory once."""
+        cls.fixtures = {
+            'japanese': create_test_midi([
+                (0x03, "日本語のテスト曲"),
+                (0x05, "さくらさくら"),
+            ], 'shift_jis'),
+            'chinese': create_test_midi([
+                (0x03, "中文歌曲测试"),
+                (0x05, "茉莉花茉莉花"),
+            ], 'gbk'),
+            'lyric': create_test_midi([(0x05, "さくらさくら")], 'shift_jis'),
+            'song': create_test_midi([
+                (0x03, "日本語のテスト曲"),
+                (0x05, "さくらさくら やよいのそらは"),
+            ], 'shift_jis'),
+        }
+        # One directory for the whole class; every test uses its own file names
+        cls.temp_dir = tempfile.mkdtemp(dir=_TEMP_ROOT)
+
+    @classmethod
+    def tearDownClass(cls):
         """Clean up temporary files."""
-        import shutil
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
+        shutil.rmtree(cls.temp_dir, ignore_errors=True)
 
     def test_detect_shift_jis(self):
         """Test detecting Shift_JIS encoding."""
-        try:
-            import chardet
-        except ImportError:
-            self.skipTest("chardet not installed")
+        if not _HAVE_DETECTOR:
+            self.skipTest("no encoding detector installed")
 
-        texts = [
-            (0x03, "日本語のテスト曲"),
-            (0x05, "さくらさくら"),
-        ]
-        midi_data = create_test_midi(texts, 'shift_jis')
+        midi_data = self.fixtures['japanese']
 
         input_path = os.path.join(self.temp_dir, 'japanese.mid')
-        with open(input_path, 'wb') as f:
-            f.write(midi_data)
+        Path(input_path).write_bytes(midi_data)
 
         results = detect_encoding(input_path)
         self.assertGreater(len(results), 0)
 
-    def test_detect_gbk(self):
-        """Test detecting GBK encoding."""
+    def test_extract_shift_jis_text(self):
+        """Test that detection sees the exact Shift_JIS text bytes."""
+        payloads = list(_text_payloads(memoryview(self.fixtures['japanese'])))
+        self.assertEqual(payloads, ["日本語のテスト曲".encode('shift_jis'),
+                                    "さくらさくら".encode('shift_jis')])
+
+    def test_extract_gbk_text(self):
+        """Test that detection sees the exact GBK text bytes."""
+        payloads = list(_text_payloads(memoryview(self.fixtures['chinese'])))
+        self.assertEqual(payloads, ["中文歌曲测试".encode('gbk'),
+                                    "茉莉花茉莉花".encode('gbk')])
+
+    def test_extract_truncated_file(self):
+        """Test that text found before the end of a truncated file is kept."""
+        song = self.fixtures['song']
+        title = "日本語のテスト曲".encode('shift_jis')
+        lyric = "さくらさくら やよいのそらは".encode('shift_jis')
+
+        # Cut inside the note events after the text
+        payloads = list(_text_payloads(memoryview(song[:-5])))
+        self.assertEqual(payloads, [title, lyric])
+
+        # Cut inside the lyric, after its first seven characters
+        cut = song.index(lyric) + 14
+        payloads = list(_text_payloads(memoryview(song[:cut])))
+        self.assertEqual(payloads, [title, lyric[:14]])
+
+    def test_detect_truncated_file(self):
+        """Test detecting the encoding of a truncated file."""
+        # Cut inside the end-of-track event
+        input_path = os.path.join(self.temp_dir, 'truncated.mid')
+        Path(input_path).write_bytes(self.fixtures['song'][:-2])
+
+        if not _HAVE_DETECTOR:
+            self.skipTest("no encoding detector installed")
+        self.assertGreater(len(detect_encoding(input_path)), 0)
         try:
-            import chardet
+            import midi_converter_standalone
         except ImportError:
-            self.skipTest("chardet not installed")
+            self.skipTest("PyQt6 not installed")
+        self.assertGreater(len(midi_converter_standalone.detect_encoding(input_path)), 0)
 
-        texts = [
-            (0x03, "中文歌曲测试"),
-            (0x05, "茉莉花茉莉花"),
-        ]
-        midi_data = create_test_midi(texts, 'gbk')
+    def test_detect_gbk(self):
+        """Test detecting GBK encoding."""
+        if not _HAVE_DETECTOR:
+            self.skipTest("no encoding detector installed")
+
+        midi_data = self.fixtures['chinese']
 
         input_path = os.path.join(self.temp_dir, 'chinese.mid')
-        with open(input_path, 'wb') as f:
-            f.write(midi_data)
+        Path(input_path).write_bytes(midi_data)
 
         results = detect_encoding(input_path)
         self.assertGreater(len(results), 0)
@@ -370,116 +653,121 @@ class TestEncodingDetection(unittest.TestCase):
     def test_detect_invalid_file(self):
         """Test detection on invalid MIDI file."""
         input_path = os.path.join(self.temp_dir, 'invalid.mid')
-        with open(input_path, 'wb') as f:
-            f.write(b'Not a MIDI file')
+        Path(input_path).write_bytes(b'Not a MIDI file')
 
         with self.assertRaises(ValueError):
             detect_encoding(input_path)
 
+    def test_detect_chardet_fallback(self):
+        """Test detection through chardet when the faster detectors are missing."""
+        if chardet is None:
+            self.skipTest("chardet not installed")
 
-class TestEdgeCases(unittest.TestCase):
-    """Tests for edge cases and error handling."""
+        midi_data = self.fixtures['lyric']
+        input_path = os.path.join(self.temp_dir, 'fallback.mid')
+        Path(input_path).write_bytes(midi_data)
 
-    def setUp(self):
-        """Create temporary directory for test files."""
-        self.temp_dir = tempfile.mkdtemp()
+        # Force the last backend in the chain, as if nothing faster were installed
+        with mock.patch.object(midi_encoding_converter, 'chardet', chardet, create=True), \
+                mock.patch.object(midi_encoding_converter, '_DETECTOR',
+                                  midi_encoding_converter._detect_chardet):
+            results = detect_encoding(input_path)
+        self.assertEqual(len(results), 1)
 
-    def tearDown(self):
-        """Clean up temporary files."""
-        import shutil
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    def test_convert_auto_detect(self):
+        """Test detecting the source encoding during conversion."""
+        input_path = os.path.join(self.temp_dir, 'auto.mid')
+        output_path = os.path.join(self.temp_dir, 'auto_utf8.mid')
+        Path(input_path).write_bytes(self.fixtures['song'])
 
-    def test_empty_text_event(self):
-        """Test handling of empty text events."""
-        texts = [
-            (0x03, ""),  # Empty track name
-            (0x05, "Lyric"),
-        ]
-        midi_data = create_test_midi(texts, 'utf-8')
+        if not _HAVE_DETECTOR:
+            self.skipTest("no encoding detector installed")
+        expected = detect_encoding(input_path)
+        self.assertGreater(len(expected), 0)
 
-        input_path = os.path.join(self.temp_dir, 'empty.mid')
-        output_path = os.path.join(self.temp_dir, 'output.mid')
+        converter = MidiEncodingConverter('utf-8', 'utf-8')
+        result = converter.convert(input_path, output_path, auto_detect=True)
 
-        with open(input_path, 'wb') as f:
-            f.write(midi_data)
+        self.assertEqual(result['from_encoding'], expected[0][0])
+        self.assertIn("さくらさくら".encode('utf-8'), Path(output_path).read_bytes())
 
-        converter = MidiEncodingConverter('utf-8', 'utf-8')
-        result = converter.convert(input_path, output_path)
 
-        self.assertEqual(result['converted'], 2)
+class TestEdgeCases(unittest.TestCase):
+    """Tests for edge cases and error handling."""
 
-    def test_long_text_event(self):
-        """Test handling of long text events."""
-        long_text = "A" * 10000  # Very long text
-        texts = [(0x03, long_text)]
-        midi_data = create_test_midi(texts, 'utf-8')
+    @classmethod
+    def setUpClass(cls):
+        """Build the test MIDI files once for the whole class."""
+        cls.fixtures = {
+            # Empty track name followed by a lyric
+            'empty': create_test_midi([(0x03, ""), (0x05, "歌詞")], 'shift_jis'),
+            'simple': create_test_midi([(0x03, "テスト")], 'shift_jis'),
+        }
 
-        input_path = os.path.join(self.temp_dir, 'long.mid')
-        output_path = os.path.join(self.temp_dir, 'output.mid')
+    def test_empty_text_event(self):
+        """Test handling of empty text events."""
+        converter = get_converter('shift_jis', 'utf-8')
+        data, result = converter.convert_bytes(self.fixtures['empty'])
 
-        with open(input_path, 'wb') as f:
-            f.write(midi_data)
+        self.assertEqual(result['converted'], 2)
+        self.assertIn(b'\xff\x03\x00', data)  # Empty track name kept
+        self.assertIn(b'\xff\x05\x06' + "歌詞".encode('utf-8'), data)
 
-        converter = MidiEncodingConverter('utf-8', 'utf-8')
-        result = converter.convert(input_path, output_path)
+    def test_long_text_event(self):
+        """Test handling of long text events."""
+        converter = get_converter('shift_jis', 'utf-8')
+        data, result = converter.convert_bytes(_LONG_MIDI)
 
         self.assertEqual(result['converted'], 1)
         self.assertEqual(result['errors'], 0)
+        # 10000 bytes of Shift_JIS become 15000 bytes of UTF-8
+        self.assertEqual(len(data), len(_LONG_MIDI) + 5000)
+        self.assertIn(b'\xff\x03' + write_variable_length(15000) + "あ".encode('utf-8'), data)
 
     def test_special_characters(self):
         """Test handling of special characters."""
-        texts = [
-            (0x03, "Test™ © ® € £ ¥"),
-            (0x05, "♪ ♫ ♬ ♩"),
-        ]
-        midi_data = create_test_midi(texts, 'utf-8')
+        converter = get_converter('utf-8', 'gb18030')
+        data, result = converter.convert_bytes(_SPECIAL_MIDI)
 
-        input_path = os.path.join(self.temp_dir, 'special.mid')
-        output_path = os.path.join(self.temp_dir, 'output.mid')
+        self.assertEqual(result['errors'], 0)
+        self.assertIn("Test™ © ® € £ ¥".encode('gb18030'), data)
+        self.assertIn("♪ ♫ ♬ ♩".encode('gb18030'), data)
 
-        with open(input_path, 'wb') as f:
-            f.write(midi_data)
+    def test_same_encoding_shortcut(self):
+        """Test that a same-encoding conversion returns the input unchanged."""
+        midi_data = _SPECIAL_MIDI
+        converter = get_converter('utf-8', 'utf-8')
+        data, result = converter.convert_bytes(midi_data)
 
-        converter = MidiEncodingConverter('utf-8', 'utf-8')
-        result = converter.convert(input_path, output_path)
-
-        self.assertEqual(result['errors'], 0)
+        self.assertEqual(data, midi_data)
+        self.assertEqual(result['converted'], 2)
+        self.assertEqual(result['output_size'], len(midi_data))
 
     def test_file_not_found(self):
         """Test handling of non-existent file."""
-        converter = MidiEncodingConverter('utf-8', 'utf-8')
+        converter = get_converter('utf-8', 'utf-8')
 
         with self.assertRaises(FileNotFoundError):
             converter.convert('nonexistent.mid', 'output.mid')
 
     def test_preserves_midi_data(self):
         """Test that MIDI note data is preserved."""
-        texts = [(0x03, "Test")]
-        midi_data = create_test_midi(texts, 'utf-8')
-
-        input_path = os.path.join(self.temp_dir, 'notes.mid')
-        output_path = os.path.join(self.temp_dir, 'output.mid')
-
-        with open(input_path, 'wb') as f:
-            f.write(midi_data)
-
-        converter = MidiEncodingConverter('utf-8', 'utf-8')
-        converter.convert(input_path, output_path)
-
-        # Read output and verify it's a valid MIDI
-        with open(output_path, 'rb') as f:
-            data = f.read()
+        converter = get_converter('shift_jis', 'utf-8')
+        data, _ = converter.convert_bytes(self.fixtures['simple'])
+        self.assertIn("テスト".encode('utf-8'), data)
 
         # Check header
         self.assertEqual(data[:4], b'MThd')
 
-        # Find MTrk marker (after header)
-        mtrk_pos = data.find(b'MTrk')
-        self.assertGreater(mtrk_pos, 0, "MTrk marker not found")
+        # The track chunk follows the 14-byte header and runs to the end
+        self.assertEqual(data[14:18], b'MTrk', "MTrk marker not found")
+        track_end = 22 + struct.unpack_from('>I', data, 18)[0]
+        self.assertEqual(track_end, len(data))
 
-        # Check that note events exist (0x90 for note on, 0x80 for note off)
-        self.assertIn(b'\x90\x3c\x64', data)  # Note on C4 velocity 100
-        self.assertIn(b'\x80\x3c\x00', data)  # Note off C4
+        # Note events sit at fixed offsets before the 4-byte end of track
+        # (0x90 for note on, 0x80 for note off)
+        self.assertEqual(data[track_end - 12:track_end - 9], b'\x90\x3c\x64')  # Note on C4 velocity 100
+        self.assertEqual(data[track_end - 7:track_end - 4], b'\x80\x3c\x00')  # Note off C4
 
 
 class TestConverterState(unittest.TestCase):
@@ -487,29 +775,16 @@ class TestConverterState(unittest.TestCase):
 
     def test_counts_reset_between_conversions(self):
         """Test that counts are reset between conversions."""
-        temp_dir = tempfile.mkdtemp()
-
-        try:
-            texts = [(0x03, "Test")]
-            midi_data = create_test_midi(texts, 'utf-8')
-
-            input_path = os.path.join(temp_dir, 'test.mid')
-            with open(input_path, 'wb') as f:
-                f.write(midi_data)
-
-            converter = MidiEncodingConverter('utf-8', 'utf-8')
-
-            # First conversion
-            result1 = converter.convert(input_path, os.path.join(temp_dir, 'out1.mid'))
-            self.assertEqual(result1['converted'], 1)
+        midi_data = create_test_midi([(0x03, "Test")], 'utf-8')
+        converter = get_converter('utf-8', 'utf-8')
 
-            # Second conversion
-            result2 = converter.convert(input_path, os.path.join(temp_dir, 'out2.mid'))
-            self.assertEqual(result2['converted'], 1)
+        # First conversion
+        _, result1 = converter.convert_bytes(midi_data)
+        self.assertEqual(result1['converted'], 1)
 
-        finally:
-            import shutil
-            shutil.rmtree(temp_dir, ignore_errors=True)
+        # Second conversion
+        _, result2 = converter.convert_bytes(midi_data)
+        self.assertEqual(result2['converted'], 1)
 
     def test_verbose_mode(self):
         """Test verbose mode setting."""
@@ -519,23 +794,39 @@ class TestConverterState(unittest.TestCase):
         converter.verbose = True
         self.assertTrue(converter.verbose)
 
+    def test_verbose_output(self):
+        """Test that verbose mode lists each converted text event."""
+        midi_data = create_test_midi([(0x03, "テスト"), (0x01, "Piano")], 'shift_jis')
+
+        converter = MidiEncodingConverter('shift_jis', 'utf-8')
+        converter.verbose = True
+        with mock.patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            converter.convert_bytes(midi_data)
+
+        # ASCII text is unchanged and therefore not listed
+        self.assertEqual(stdout.getvalue(), "  [Track Name] テスト\n")
+
+
+# Test classes run by run_tests(), in order
+_TEST_CLASSES = (
+    TestVariableLengthEncoding,
+    TestTextConversion,
+    TestMidiConversion,
+    TestEncodingDetection,
+    TestEdgeCases,
+    TestConverterState,
+)
+
 
 def run_tests():
     """Run all tests and print summary."""
-    # Create a test suite
+    # Create a test suite from all test classes
     loader = unittest.TestLoader()
-    suite = unittest.TestSuite()
-
-    # Add all test classes
-    suite.addTests(loader.loadTestsFromTestCase(TestVariableLengthEncoding))
-    suite.addTests(loader.loadTestsFromTestCase(TestTextConversion))
-    suite.addTests(loader.loadTestsFromTestCase(TestMidiConversion))
-    suite.addTests(loader.loadTestsFromTestCase(TestEncodingDetection))
-    suite.addTests(loader.loadTestsFromTestCase(TestEdgeCases))
-    suite.addTests(loader.loadTestsFromTestCase(TestConverterState))
-
-    # Run with verbosity
-    runner = unittest.TextTestRunner(verbosity=2)
+    suite = unittest.TestSuite(loader.loadTestsFromTestCase(c) for c in _TEST_CLASSES)
+
+    # One dot per test; set MIDI_TEST_VERBOSE=1 to list every test
+    verbosity = 2 if os.environ.get('MIDI_TEST_VERBOSE') == '1' else 1
+    runner = unittest.TextTestRunner(verbosity=verbosity)
     result = runner.run(suite)
 
     # Print summary